@@ -1,28 +1,231 @@
 # app/benchmark.py
-import json
 import csv
 import time
 import logging
-import statistics
 import math
-from typing import List, Dict, Any, Tuple, Optional
+from typing import List, Dict, Any, Tuple, Optional, BinaryIO, Deque, NamedTuple
 import os
+import sys
+import orjson
 import requests
+from collections import Counter, deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from contextlib import ExitStack
+from dataclasses import dataclass
 from datetime import datetime
+from functools import partial
+from pydantic import BaseModel
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException, ConnectionError
 
 logger = logging.getLogger(__name__)
 
 
+# Schema fisso del CSV dei risultati: permette di scrivere le righe man mano.
+CSV_FIELDNAMES: Tuple[str, ...] = (
+    "id",
+    "tags",
+    "question",
+    "gold_answer",
+    "llm_only_answer",
+    "nsla_answer",
+    "nsla_v2_answer",
+    "nsla_iter_answer",
+    "llm_only_correct",
+    "nsla_correct",
+    "nsla_v2_correct",
+    "nsla_iter_correct",
+    "llm_only_EM",
+    "nsla_EM",
+    "nsla_v2_EM",
+    "nsla_iter_EM",
+    "llm_only_F1",
+    "nsla_F1",
+    "nsla_v2_F1",
+    "nsla_iter_F1",
+    "bleu_score_llm",
+    "bleu_score_nsla",
+    "bleu_score_nsla_v2",
+    "bleu_score_nsla_iter",
+    "judge_vote",
+    "judge_confidence",
+    "judge_rationale",
+    "v2_judge_vote",
+    "v2_judge_confidence",
+    "v2_judge_rationale",
+    "llm_only_time",
+    "nsla_time",
+    "nsla_v2_time",
+    "nsla_iter_time",
+    "verified",
+    "v2_feedback_status",
+    "v2_missing_links",
+    "v2_guardrail_ok",
+    "v2_guardrail_issues",
+    "v2_fallback_used",
+    "v2_explanation",
+    "v2_feedback_v1_status",
+    "v2_llm_status",
+    "iter_status",
+    "iter_missing_links",
+    "iter_conflicts",
+    "iter_guardrail_ok",
+    "iter_guardrail_issues",
+    "iter_iterations",
+    "iter_llm_status",
+    "delta_f1_v2_vs_v1",
+    "delta_f1_iter_vs_v2",
+    "error",
+)
+
+
+class _RunningStat:
+    """Media e deviazione standard campionaria calcolate online (algoritmo di Welford)."""
+
+    __slots__ = ("count", "mean", "_m2")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def push(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    def stdev(self) -> float:
+        """Equivalente a `statistics.stdev` sui valori visti (0.0 con meno di due campioni)."""
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+
+class BenchFeedback(BaseModel):
+    """Sottoinsieme del LogicFeedback restituito dagli endpoint v2 usato dal benchmark."""
+
+    status: Optional[str] = "unknown"
+    missing_links: Optional[List[str]] = None
+    conflicting_axioms: Optional[List[str]] = None
+
+
+class BenchGuardrail(BaseModel):
+    """Esito del guardrail così come serializzato dagli endpoint v2."""
+
+    ok: Optional[bool] = None
+    issues: Optional[List[Any]] = None
+
+
+class BenchJudge(BaseModel):
+    """Voto del judge (campo `judge` di /legal_query_v2 e risposta di /judge_compare)."""
+
+    vote: Optional[str] = "tie"
+    confidence: Optional[float] = 0.0
+    rationale: Optional[str] = ""
+
+
+class BenchExplanation(BaseModel):
+    """Spiegazione strutturata (solo il riassunto)."""
+
+    summary: Optional[str] = ""
+
+
+class BenchStatus(BaseModel):
+    """Oggetto di cui interessa solo lo `status`."""
+
+    status: Optional[str] = None
+
+
+class BenchPhase2(BaseModel):
+    """Artefatti Phase 2 esposti da /legal_query_v2."""
+
+    feedback_v1: Optional[BenchStatus] = None
+
+
+class LegalQueryV2Response(BaseModel):
+    """Schema (tollerante) della risposta di /legal_query_v2 letta dal benchmark."""
+
+    final_answer: Optional[str] = ""
+    feedback: Optional[BenchFeedback] = None
+    guardrail: Optional[BenchGuardrail] = None
+    llm_status: Optional[Dict[str, Any]] = None
+    fallback_used: Optional[bool] = False
+    explanation: Optional[BenchExplanation] = None
+    phase2: Optional[BenchPhase2] = None
+    judge: Optional[BenchJudge] = None
+
+
+class IterativeBest(BaseModel):
+    """Migliore iterazione restituita da /legal_query_v2_iterative."""
+
+    final_answer: Optional[str] = ""
+    feedback: Optional[BenchFeedback] = None
+    guardrail: Optional[BenchGuardrail] = None
+
+
+class LegalQueryV2IterativeResponse(BaseModel):
+    """Schema (tollerante) della risposta di /legal_query_v2_iterative letta dal benchmark."""
+
+    best: Optional[IterativeBest] = None
+    history: Optional[List[Any]] = None
+    llm_status: Optional[Dict[str, Any]] = None
+
+
+_DEFAULT_POOL_MAXSIZE = 64
+
+
+def _mount_adapter(session: requests.Session, pool_maxsize: int) -> None:
+    # Gli adapter sostituiti vanno chiusi: altrimenti le loro connessioni keep-alive
+    # restano aperte fino al garbage collector
+    previous = {
+        id(old): old
+        for prefix, old in session.adapters.items()
+        if prefix in ("http://", "https://")
+    }
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=pool_maxsize)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    for old in previous.values():
+        old.close()
+
+
+def _build_session() -> requests.Session:
+    """Crea una sessione HTTP con connessioni keep-alive riutilizzate tra le chiamate."""
+    session = requests.Session()
+    _mount_adapter(session, _DEFAULT_POOL_MAXSIZE)
+    return session
+
+
+# Sessione condivisa da tutti gli helper `call_*`: evita un handshake TCP per richiesta.
+_SESSION = _build_session()
+_session_pool_maxsize = _DEFAULT_POOL_MAXSIZE
+
+
+def _ensure_session_capacity(concurrency: int) -> None:
+    """
+    Allarga il pool keep-alive se la run può avere più richieste in volo del pool.
+
+    Con un pool troppo piccolo urllib3 scarta le connessioni in eccesso a fine
+    richiesta e le successive ripagano l'handshake. Va chiamata prima di avviare i worker.
+    """
+    global _session_pool_maxsize
+    if concurrency <= _session_pool_maxsize:
+        return
+    _mount_adapter(_SESSION, concurrency)
+    _session_pool_maxsize = concurrency
+
+
 def _prepare_timeout(value: Optional[float]) -> Optional[float]:
     """
     Normalize timeout values for requests.
 
+    `run_benchmark` calls this once per timeout; the `call_*` helpers receive
+    the normalized value and pass it straight to the session.
+
     Args:
         value: Timeout in seconds. Values <= 0 disable the timeout.
 
     Returns:
-        float | None suitable for `requests.post(timeout=...)`.
+        float | None suitable for `Session.post(timeout=...)`.
     """
     if value is None:
         return None
@@ -35,8 +238,13 @@ def _prepare_timeout(value: Optional[float]) -> Optional[float]:
 
 def load_cases(path: str) -> List[Dict[str, Any]]:
     """Carica i casi di test dal file JSON specificato."""
-    with open(path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    with open(path, 'rb') as f:
+        return orjson.loads(f.read())
+
+
+def _parse_json(response: requests.Response) -> Any:
+    """Decodifica il body JSON direttamente dai bytes (più veloce di `response.json()`)."""
+    return orjson.loads(response.content)
 
 
 def call_llm_only(
@@ -44,18 +252,20 @@ def call_llm_only(
     question: str,
     timeout: Optional[float] = 30.0,
 ) -> Tuple[str, float]:
-    """Chiama l'endpoint /llm_only e misura il tempo di risposta."""
+    """
+    Chiama l'endpoint /llm_only e misura il tempo di risposta.
+
+    `timeout` è già normalizzato (vedi `_prepare_timeout`): None disabilita il timeout.
+    """
     url = f"{base_url}/llm_only"
     start_time = time.perf_counter()
     
-    request_timeout = _prepare_timeout(timeout)
-    
     try:
-        response = requests.post(url, json={"question": question}, timeout=request_timeout)
+        response = _SESSION.post(url, json={"question": question}, timeout=timeout)
         if response.status_code != 200:
             raise RuntimeError(f"HTTP {response.status_code} from /llm_only")
         elapsed = time.perf_counter() - start_time
-        data = response.json()
+        data = _parse_json(response)
         return data.get("answer", ""), elapsed
     except RequestException as e:
         # Lascia che ConnectionError e altre RequestException siano propagate
@@ -68,18 +278,16 @@ def call_legal_query(
     question: str,
     timeout: Optional[float] = 60.0,
 ) -> Tuple[Dict[str, Any], float]:
-    """Chiama l'endpoint /legal_query e misura il tempo di risposta."""
+    """Chiama l'endpoint /legal_query e misura il tempo di risposta (timeout già normalizzato)."""
     url = f"{base_url}/legal_query"
     start_time = time.perf_counter()
     
-    request_timeout = _prepare_timeout(timeout)
-    
     try:
-        response = requests.post(url, json={"question": question}, timeout=request_timeout)
+        response = _SESSION.post(url, json={"question": question}, timeout=timeout)
         if response.status_code != 200:
             raise RuntimeError(f"HTTP {response.status_code} from /legal_query")
         elapsed = time.perf_counter() - start_time
-        return response.json(), elapsed
+        return _parse_json(response), elapsed
     except RequestException as e:
         elapsed = time.perf_counter() - start_time
         raise
@@ -90,22 +298,25 @@ def call_legal_query_v2(
     question: str,
     reference_answer: Optional[str] = None,
     timeout: Optional[float] = 240.0,
-) -> Tuple[Dict[str, Any], float]:
-    """Chiama l'endpoint /legal_query_v2 e misura il tempo di risposta."""
+) -> Tuple[LegalQueryV2Response, float]:
+    """
+    Chiama l'endpoint /legal_query_v2 e misura il tempo di risposta (timeout già normalizzato).
+
+    Il body viene validato direttamente dai bytes nello schema, senza passare da un dict.
+    """
     url = f"{base_url}/legal_query_v2"
     start_time = time.perf_counter()
 
     payload = {"question": question}
     if reference_answer is not None:
         payload["reference_answer"] = reference_answer
-    request_timeout = _prepare_timeout(timeout)
 
-    response = requests.post(url, json=payload, timeout=request_timeout)
+    response = _SESSION.post(url, json=payload, timeout=timeout)
     if response.status_code != 200:
         elapsed = time.perf_counter() - start_time
         raise RuntimeError(f"HTTP {response.status_code} from /legal_query_v2")
     elapsed = time.perf_counter() - start_time
-    return response.json(), elapsed
+    return LegalQueryV2Response.model_validate_json(response.content), elapsed
 
 
 def call_legal_query_v2_iterative(
@@ -113,38 +324,139 @@ def call_legal_query_v2_iterative(
     question: str,
     max_iters: int = 3,
     timeout: Optional[float] = 300.0,
-) -> Tuple[Dict[str, Any], float]:
-    """Chiama l'endpoint /legal_query_v2_iterative e misura il tempo di risposta."""
+) -> Tuple[LegalQueryV2IterativeResponse, float]:
+    """
+    Chiama l'endpoint /legal_query_v2_iterative e misura il tempo di risposta
+    (timeout già normalizzato), validando il body dai bytes nello schema.
+    """
     max_iters = max(1, max_iters)
     url = f"{base_url}/legal_query_v2_iterative?max_iters={max_iters}"
     start_time = time.perf_counter()
 
-    request_timeout = _prepare_timeout(timeout)
-
-    response = requests.post(url, json={"question": question}, timeout=request_timeout)
+    response = _SESSION.post(url, json={"question": question}, timeout=timeout)
     if response.status_code != 200:
         elapsed = time.perf_counter() - start_time
         raise RuntimeError(f"HTTP {response.status_code} from /legal_query_v2_iterative")
     elapsed = time.perf_counter() - start_time
-    return response.json(), elapsed
+    return LegalQueryV2IterativeResponse.model_validate_json(response.content), elapsed
 
 
-def is_correct(predicted: str, gold: str) -> bool:
-    """Controlla se la gold_answer è contenuta nella risposta predetta (case-insensitive)."""
-    return gold.lower() in predicted.lower()
+def _dispatch_case_calls(
+    base_url: str,
+    question: str,
+    gold_answer: str,
+    iter_max: int,
+    timeouts: Dict[str, Optional[float]],
+    responses: Dict[str, Tuple[Any, float]],
+    executor: Optional[Executor] = None,
+) -> None:
+    """
+    Esegue le quattro chiamate HTTP di un caso e popola `responses`.
+
+    Le chiamate non hanno dipendenze tra loro: se viene passato un executor
+    vengono inviate in parallelo (wall-clock = max delle latenze invece della
+    somma), altrimenti vengono eseguite in sequenza fermandosi al primo errore.
+    In entrambi i casi `responses` contiene le chiamate riuscite anche quando
+    viene sollevata un'eccezione, così i tempi parziali restano disponibili.
+    """
+    jobs = {
+        "llm": (call_llm_only, (base_url, question), {"timeout": timeouts["llm"]}),
+        "nsla": (call_legal_query, (base_url, question), {"timeout": timeouts["nsla"]}),
+        "v2": (
+            call_legal_query_v2,
+            (base_url, question),
+            {"reference_answer": gold_answer, "timeout": timeouts["v2"]},
+        ),
+        "iter": (
+            call_legal_query_v2_iterative,
+            (base_url, question, iter_max),
+            {"timeout": timeouts["iter"]},
+        ),
+    }
+
+    if executor is None:
+        for key, (func, args, kwargs) in jobs.items():
+            responses[key] = func(*args, **kwargs)
+        return
+
+    futures = {
+        key: executor.submit(func, *args, **kwargs)
+        for key, (func, args, kwargs) in jobs.items()
+    }
+    first_error: Optional[BaseException] = None
+    for key, future in futures.items():
+        try:
+            responses[key] = future.result()
+        except Exception as exc:
+            # Riporta il primo errore nell'ordine canonico degli endpoint
+            if first_error is None:
+                first_error = exc
+    if first_error is not None:
+        raise first_error
+
+
+def _to_float(value: Any, default: float = 0.0) -> float:
+    """Converte la confidence del judge in float (già float nel caso comune, None/"" -> default)."""
+    if isinstance(value, float):
+        return value
+    return float(value) if value else default
+
+
+def is_correct(predicted: str, gold: str, gold_lower: Optional[str] = None) -> bool:
+    """
+    Controlla se la gold_answer è contenuta nella risposta predetta (case-insensitive).
+
+    `gold_lower` evita di ripetere il lowercasing della gold per ogni risposta del caso.
+    """
+    if not gold:
+        return True
+    if not predicted:
+        return False
+    if gold_lower is None:
+        gold_lower = gold.lower()
+    return gold_lower in predicted.lower()
 
 
 def _tokenize(text: str) -> set:
     """Tokenizza un testo in modo semplice: split su spazi e lowercasing."""
-    return set(word.lower() for word in text.split() if word.strip())
+    return {word.lower() for word in text.split()}
 
 
-def _f1_score(predicted: str, gold: str) -> float:
-    """Calcola l'F1 basato su sovrapposizione token-level."""
-    if not predicted.strip() or not gold.strip():
-        return 0.0
+class _GoldCache(NamedTuple):
+    """Pre-elaborazioni della gold answer condivise dalle quattro risposte di un caso."""
+
+    text: str
+    lower: str
+    norm: str
+    tokens: set
+    words: List[str]
+    ngrams: Dict[int, set]
+
+
+def _gold_ngram_sets(gold_words: List[str]) -> Dict[int, set]:
+    """Insiemi di n-gram della gold per n=1..4 (limitati alla lunghezza della gold)."""
+    return {
+        n: {tuple(gold_words[i:i+n]) for i in range(len(gold_words)-n+1)}
+        for n in range(1, min(5, len(gold_words) + 1))
+    }
+
+
+def _precompute_gold(gold: str) -> _GoldCache:
+    """Calcola una sola volta lowercasing, token e n-gram della gold answer."""
+    lower = gold.lower()
+    words = lower.split()
+    return _GoldCache(
+        text=gold,
+        lower=lower,
+        norm=lower.strip(),
+        tokens=set(words),
+        words=words,
+        ngrams=_gold_ngram_sets(words),
+    )
+
+
+def _f1_from_tokens(predicted: str, gold_tokens: set) -> float:
     pred_tokens = _tokenize(predicted)
-    gold_tokens = _tokenize(gold)
     if not pred_tokens and not gold_tokens:
         return 1.0
     if not pred_tokens or not gold_tokens:
@@ -157,47 +469,83 @@ def _f1_score(predicted: str, gold: str) -> float:
     return 2 * precision * recall / (precision + recall)
 
 
-def _bleu_score_simple(predicted: str, gold: str) -> float:
-    """Calcola un BLEU semplificato basato su n-gram overlap."""
-    if not predicted.strip() or not gold.strip():
+def _f1_score(predicted: str, gold: str, gold_tokens: Optional[set] = None) -> float:
+    """
+    Calcola l'F1 basato su sovrapposizione token-level.
+
+    `gold_tokens` permette di riutilizzare la tokenizzazione della gold answer
+    quando la stessa gold viene confrontata con più risposte.
+    """
+    # Le risposte vuote (casi falliti) escono prima di qualsiasi strip/tokenizzazione
+    if not predicted or not gold or not predicted.strip() or not gold.strip():
         return 0.0
-    
-    pred_words = predicted.lower().split()
-    gold_words = gold.lower().split()
-    
-    if len(gold_words) == 0:
+    if gold_tokens is None:
+        gold_tokens = _tokenize(gold)
+    return _f1_from_tokens(predicted, gold_tokens)
+
+
+def _f1_score_fast(predicted: str, gold: _GoldCache) -> float:
+    """Come `_f1_score`, ma con la gold già pre-elaborata da `_precompute_gold`."""
+    if not predicted or not gold.norm or not predicted.strip():
+        return 0.0
+    return _f1_from_tokens(predicted, gold.tokens)
+
+
+def _bleu_from_words(
+    pred_words: List[str],
+    gold_words: List[str],
+    gold_ngrams: Dict[int, set],
+) -> float:
+    n_gold = len(gold_words)
+    if n_gold == 0:
         return 0.0
+    n_pred = len(pred_words)
+    max_n = min(4, n_gold)
     
-    # Calcola ungegram precision per n=1,2,3,4
-    precisions = []
-    for n in range(1, min(5, len(gold_words) + 1)):
-        if n > len(pred_words):
-            precisions.append(0.0)
-            continue
-            
-        pred_ngrams = [tuple(pred_words[i:i+n]) for i in range(len(pred_words)-n+1)]
-        gold_ngrams = [tuple(gold_words[i:i+n]) for i in range(len(gold_words)-n+1)]
-        
-        if not pred_ngrams:
-            precisions.append(0.0)
-            continue
-            
-        common = sum(1 for ngram in pred_ngrams if ngram in gold_ngrams)
-        precision = common / len(pred_ngrams)
-        precisions.append(precision)
+    # Un'unica passata sulla risposta: da ogni posizione si estendono gli n-gram 1..max_n.
+    # Lookup O(1) nei set della gold; il conteggio resta sulle occorrenze predette (non clippato).
+    # Se l'n-gram che parte da i non è nella gold, non lo sono nemmeno i più lunghi
+    # (ne contengono il prefisso): l'estensione si interrompe al primo mancato match.
+    matches = [0] * (max_n + 1)
+    for i in range(n_pred):
+        for n in range(1, min(max_n, n_pred - i) + 1):
+            if tuple(pred_words[i:i+n]) not in gold_ngrams[n]:
+                break
+            matches[n] += 1
+    
+    # Precisione per n=1..4 (0 se la risposta è più corta di n)
+    precisions = [
+        matches[n] / (n_pred - n + 1) if n <= n_pred else 0.0
+        for n in range(1, max_n + 1)
+    ]
     
     # Calcola BLEU con brevità penalizzata
-    if not precisions or all(p == 0 for p in precisions):
+    if all(p == 0 for p in precisions):
         return 0.0
     
     geometric_mean = math.exp(
         sum(math.log(max(p, 1e-10)) for p in precisions) / len(precisions)
     )
-    bp = min(1.0, math.exp(1 - len(gold_words) / max(len(pred_words), 1)))
+    bp = min(1.0, math.exp(1 - n_gold / max(n_pred, 1)))
     
     return bp * geometric_mean
 
 
+def _bleu_score_simple(predicted: str, gold: str) -> float:
+    """Calcola un BLEU semplificato basato su n-gram overlap."""
+    if not predicted.strip() or not gold.strip():
+        return 0.0
+    gold_words = gold.lower().split()
+    return _bleu_from_words(predicted.lower().split(), gold_words, _gold_ngram_sets(gold_words))
+
+
+def _bleu_score_simple_fast(predicted: str, gold: _GoldCache) -> float:
+    """Come `_bleu_score_simple`, ma riusa parole e n-gram della gold pre-calcolati."""
+    if not predicted or not gold.norm or not predicted.strip():
+        return 0.0
+    return _bleu_from_words(predicted.lower().split(), gold.words, gold.ngrams)
+
+
 def call_judge_llm(
     question: str,
     answer_llm: str,
@@ -209,6 +557,7 @@ def call_judge_llm(
     """
     Call the dedicated judge endpoint to compare LLM-only vs NSLA answers.
     Returns a dict with vote/confidence/rationale.
+    `timeout` must already be normalized with `_prepare_timeout` (None disables it).
     """
     payload = {
         "question": question,
@@ -219,34 +568,56 @@ def call_judge_llm(
         "label_b": "NSLA",
     }
 
-    request_timeout = _prepare_timeout(timeout)
-
     try:
-        response = requests.post(
+        response = _SESSION.post(
             f"{base_url}/judge_compare",
             json=payload,
-            timeout=request_timeout,
+            timeout=timeout,
         )
         if response.status_code == 200:
-            data = response.json()
+            judge = BenchJudge.model_validate(_parse_json(response))
             return {
-                "vote": data.get("vote", "tie"),
-                "confidence": data.get("confidence", 0.0),
-                "rationale": data.get("rationale", ""),
+                "vote": judge.vote,
+                "confidence": judge.confidence,
+                "rationale": judge.rationale,
             }
-    except RequestException:
+    except (RequestException, ValueError):
+        # Body non decodificabile o non valido: il judge è opzionale, si ripiega sul pareggio
         pass
 
     return {"vote": "tie", "confidence": 0.0, "rationale": ""}
 
 
-def _log_request(case_id: str, question: str, result: Dict[str, Any], duration: float):
-    """Logga la richiesta in formato JSON per analisi."""
-    log_dir = "logs"
+def _new_run_id() -> str:
+    """Identificativo della run (timestamp locale), usato anche nel nome del file di log."""
+    return datetime.now().strftime('%Y%m%d_%H%M%S')
+
+
+def _open_log_file(run_id: Optional[str] = None, log_dir: str = "logs") -> BinaryIO:
+    """Apre (in append, buffered) il file di log JSONL della run indicata."""
     os.makedirs(log_dir, exist_ok=True)
-    
+    log_path = os.path.join(log_dir, f"benchmark_{run_id or _new_run_id()}.json")
+    return open(log_path, 'ab')
+
+
+def _log_request(
+    case_id: str,
+    question: str,
+    result: Dict[str, Any],
+    duration: float,
+    log_file: Optional[BinaryIO] = None,
+    run_id: Optional[str] = None,
+):
+    """
+    Logga la richiesta in formato JSON per analisi.
+
+    Se `log_file` è fornito la riga viene scritta sull'handle già aperto
+    (nessuna open/close per chiamata); altrimenti viene aperto il file di `run_id`.
+    `timestamp` è in secondi epoch (`time.time()`): la formattazione ISO va fatta in lettura.
+    """
     log_entry = {
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": time.time(),
+        "run_id": run_id,
         "case_id": case_id,
         "question": question,
         "duration": duration,
@@ -263,10 +634,316 @@ def _log_request(case_id: str, question: str, result: Dict[str, Any], duration:
         },
         "error": result.get("error")
     }
+    line = orjson.dumps(log_entry) + b"\n"
+
+    if log_file is not None:
+        log_file.write(line)
+        return
+    with _open_log_file(run_id) as f:
+        f.write(line)
+
+
+def _dump_llm_status(status: Dict[str, Any]) -> str:
+    """
+    Serializza una sola volta il blocco llm_status per la colonna CSV.
+    Il caso vuoto (errori, endpoint senza LLM) non passa dall'encoder.
+    """
+    if not status:
+        return "{}"
+    return orjson.dumps(status).decode("utf-8")
+
+
+@dataclass
+class _CaseOutcome:
+    """Risultato di un singolo caso: riga CSV più i valori grezzi usati per l'aggregazione."""
+
+    row: Dict[str, Any]
+    success: bool
+    error_message: Optional[str]
+    f1: Tuple[float, float, float, float]
+    bleu: Tuple[float, float, float, float]
+    tags: List[str]
+    structured: Dict[str, Any]
+    judge_future: Optional[Future] = None
+
+
+def _run_case(
+    case: Dict[str, Any],
+    base_url: str,
+    timeouts: Dict[str, Optional[float]],
+    use_bleu: bool,
+    timeout_judge: Optional[float],
+    endpoint_executor: Optional[Executor] = None,
+    judge_executor: Optional[Executor] = None,
+) -> _CaseOutcome:
+    """
+    Esegue le chiamate e lo scoring di un caso senza toccare stato condiviso,
+    così può girare in un worker thread; l'aggregazione resta al chiamante.
+
+    Se `judge_executor` è fornito la chiamata al judge viene solo sottomessa:
+    il worker passa subito al caso successivo e il voto arriva in `judge_future`.
+    """
+    case_id = case["id"]
+    question = case["question"]
+    gold_answer = case["gold_answer"]
+    tags = case.get("tags", [])
+    iter_cfg = case.get("iter", {})
+    iter_max = int(iter_cfg.get("max_iters", 3))
     
-    log_file = os.path.join(log_dir, f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
-    with open(log_file, 'a', encoding='utf-8') as f:
-        f.write(json.dumps(log_entry, ensure_ascii=False) + "\n")
+    # Valori di default per la riga
+    llm_only_answer = ""
+    nsla_answer = ""
+    nsla_v2_answer = ""
+    nsla_iter_answer = ""
+    verified = False
+    llm_only_correct = False
+    nsla_correct = False
+    nsla_v2_correct = False
+    nsla_iter_correct = False
+    t_llm = 0.0
+    t_nsla = 0.0
+    t_nsla_v2 = 0.0
+    t_nsla_iter = 0.0
+    case_error = None
+    em_llm = 0
+    em_nsla = 0
+    em_nsla_v2 = 0
+    em_nsla_iter = 0
+    f1_llm = 0.0
+    f1_nsla = 0.0
+    f1_nsla_v2 = 0.0
+    f1_nsla_iter = 0.0
+    bleu_llm = 0.0
+    bleu_nsla = 0.0
+    bleu_nsla_v2 = 0.0
+    bleu_nsla_iter = 0.0
+    judge_vote = "tie"
+    judge_confidence = 0.0
+    judge_rationale = ""
+    v2_judge_vote = ""
+    v2_judge_confidence = 0.0
+    v2_judge_rationale = ""
+    v2_feedback_status = ""
+    v2_missing_links = []
+    v2_guardrail_ok = None
+    v2_guardrail_issues = 0
+    v2_fallback_used = False
+    v2_explanation = ""
+    v2_feedback_v1_status = ""
+    v2_llm_status = {}
+    v2_llm_status_json = "{}"
+    iter_status = ""
+    iter_missing = []
+    iter_conflicts = []
+    iter_guardrail_ok = None
+    iter_guardrail_issues = 0
+    iter_iterations = 0
+    iter_llm_status = {}
+    iter_llm_status_json = "{}"
+    responses: Dict[str, Tuple[Any, float]] = {}
+    success = False
+    error_message = None
+    judge_future = None
+    
+    try:
+        # Chiama gli endpoint principali
+        try:
+            _dispatch_case_calls(
+                base_url,
+                question,
+                gold_answer,
+                iter_max,
+                timeouts,
+                responses,
+                executor=endpoint_executor,
+            )
+        finally:
+            t_llm = responses.get("llm", (None, 0.0))[1]
+            t_nsla = responses.get("nsla", (None, 0.0))[1]
+            t_nsla_v2 = responses.get("v2", (None, 0.0))[1]
+            t_nsla_iter = responses.get("iter", (None, 0.0))[1]
+        llm_answer = responses["llm"][0]
+        nsla_json = responses["nsla"][0]
+        v2 = responses["v2"][0]
+        iter_result = responses["iter"][0]
+        
+        # Estrazione informazioni da /legal_query
+        llm_only_answer = llm_answer
+        nsla_answer = nsla_json.get("final_answer") or nsla_json.get("answer", "")
+        verified = bool(nsla_json.get("verified", False))
+        
+        # Phase 2 artifacts
+        nsla_v2_answer = v2.final_answer or ""
+        v2_feedback = v2.feedback or BenchFeedback()
+        v2_feedback_status = v2_feedback.status
+        v2_missing_links = v2_feedback.missing_links or []
+        v2_guardrail = v2.guardrail or BenchGuardrail()
+        v2_llm_status = v2.llm_status or {}
+        v2_llm_status_json = _dump_llm_status(v2_llm_status)
+        v2_guardrail_ok = v2_guardrail.ok
+        v2_guardrail_issues = len(v2_guardrail.issues or [])
+        v2_fallback_used = bool(v2.fallback_used)
+        v2_explanation = (v2.explanation.summary if v2.explanation else "") or ""
+        v2_feedback_v1_status = (
+            v2.phase2.feedback_v1.status
+            if v2.phase2 is not None and v2.phase2.feedback_v1 is not None
+            else ""
+        ) or ""
+        # Un `judge: {}` vuoto conta come assente, come nel dict originale
+        if v2.judge is not None and v2.judge.model_fields_set:
+            v2_judge_vote = v2.judge.vote
+            v2_judge_confidence = _to_float(v2.judge.confidence)
+            v2_judge_rationale = v2.judge.rationale or ""
+
+        # Phase 3 artifacts
+        best_iter = iter_result.best or IterativeBest()
+        iter_llm_status = iter_result.llm_status or {}
+        iter_llm_status_json = _dump_llm_status(iter_llm_status)
+        iter_iterations = len(iter_result.history or [])
+        nsla_iter_answer = best_iter.final_answer or ""
+        iter_feedback = best_iter.feedback or BenchFeedback()
+        iter_status = iter_feedback.status
+        iter_missing = iter_feedback.missing_links or []
+        iter_conflicts = iter_feedback.conflicting_axioms or []
+        iter_guardrail = best_iter.guardrail or BenchGuardrail()
+        iter_guardrail_ok = iter_guardrail.ok
+        iter_guardrail_issues = len(iter_guardrail.issues or [])
+        
+        # Valutazione correctness
+        # Token, n-gram e forme normalizzate della gold calcolati una sola volta per caso
+        gold = _precompute_gold(gold_answer)
+        llm_only_correct = is_correct(llm_only_answer, gold_answer, gold.lower)
+        nsla_correct = is_correct(nsla_answer, gold_answer, gold.lower)
+        nsla_v2_correct = is_correct(nsla_v2_answer, gold_answer, gold.lower)
+        nsla_iter_correct = is_correct(nsla_iter_answer, gold_answer, gold.lower)
+        
+        # Calcolo EM e F1
+        em_llm = 1 if llm_only_answer.strip().lower() == gold.norm else 0
+        em_nsla = 1 if nsla_answer.strip().lower() == gold.norm else 0
+        em_nsla_v2 = 1 if nsla_v2_answer.strip().lower() == gold.norm else 0
+        em_nsla_iter = 1 if nsla_iter_answer.strip().lower() == gold.norm else 0
+        f1_llm = _f1_score_fast(llm_only_answer, gold)
+        f1_nsla = _f1_score_fast(nsla_answer, gold)
+        f1_nsla_v2 = _f1_score_fast(nsla_v2_answer, gold)
+        f1_nsla_iter = _f1_score_fast(nsla_iter_answer, gold)
+        
+        # Calcolo BLEU (se richiesto)
+        if use_bleu:
+            bleu_llm = _bleu_score_simple_fast(llm_only_answer, gold)
+            bleu_nsla = _bleu_score_simple_fast(nsla_answer, gold)
+            bleu_nsla_v2 = _bleu_score_simple_fast(nsla_v2_answer, gold)
+            bleu_nsla_iter = _bleu_score_simple_fast(nsla_iter_answer, gold)
+        
+        # Judge LLM (se richiesto): fuori dal percorso critico del caso
+        if judge_executor is not None:
+            judge_future = judge_executor.submit(
+                call_judge_llm,
+                question,
+                llm_only_answer,
+                nsla_v2_answer,
+                gold_answer,
+                base_url,
+                timeout=timeout_judge,
+            )
+        
+        # Caso di successo
+        success = True
+        
+    except (ConnectionError, RuntimeError, RequestException) as e:
+        # Gestione errori di connessione e HTTP
+        case_error = str(e)
+        logger.error("Errore nel processare il caso %s: %s", case_id, e)
+        error_message = f"Caso {case_id} fallito: {e}"
+    except Exception as e:
+        # Gestione di altri errori imprevisti
+        case_error = f"Errore imprevisto: {str(e)}"
+        logger.error("Errore imprevisto nel caso %s: %s", case_id, e)
+        error_message = f"Caso {case_id} fallito: {case_error}"
+    
+    # Crea la riga per questo caso
+    row = {
+        "id": case_id,
+        "tags": ",".join(tags) if tags else "",
+        "question": question,
+        "gold_answer": gold_answer,
+        "llm_only_answer": llm_only_answer,
+        "nsla_answer": nsla_answer,
+        "nsla_v2_answer": nsla_v2_answer,
+        "nsla_iter_answer": nsla_iter_answer,
+        "llm_only_correct": llm_only_correct,
+        "nsla_correct": nsla_correct,
+        "nsla_v2_correct": nsla_v2_correct,
+        "nsla_iter_correct": nsla_iter_correct,
+        "llm_only_EM": em_llm,
+        "nsla_EM": em_nsla,
+        "nsla_v2_EM": em_nsla_v2,
+        "nsla_iter_EM": em_nsla_iter,
+        "llm_only_F1": round(f1_llm * 100, 2),
+        "nsla_F1": round(f1_nsla * 100, 2),
+        "nsla_v2_F1": round(f1_nsla_v2 * 100, 2),
+        "nsla_iter_F1": round(f1_nsla_iter * 100, 2),
+        "bleu_score_llm": round(bleu_llm * 100, 2),
+        "bleu_score_nsla": round(bleu_nsla * 100, 2),
+        "bleu_score_nsla_v2": round(bleu_nsla_v2 * 100, 2),
+        "bleu_score_nsla_iter": round(bleu_nsla_iter * 100, 2),
+        "judge_vote": judge_vote,
+        "judge_confidence": judge_confidence,
+        "judge_rationale": judge_rationale,
+        "v2_judge_vote": v2_judge_vote,
+        "v2_judge_confidence": v2_judge_confidence,
+        "v2_judge_rationale": v2_judge_rationale,
+        "llm_only_time": t_llm,
+        "nsla_time": t_nsla,
+        "nsla_v2_time": t_nsla_v2,
+        "nsla_iter_time": t_nsla_iter,
+        "verified": verified,
+        "v2_feedback_status": v2_feedback_status,
+        "v2_missing_links": "|".join(v2_missing_links),
+        "v2_guardrail_ok": v2_guardrail_ok,
+        "v2_guardrail_issues": v2_guardrail_issues,
+        "v2_fallback_used": v2_fallback_used,
+        "v2_explanation": v2_explanation,
+        "v2_feedback_v1_status": v2_feedback_v1_status,
+        "v2_llm_status": v2_llm_status_json,
+        "iter_status": iter_status,
+        "iter_missing_links": "|".join(iter_missing),
+        "iter_conflicts": "|".join(iter_conflicts),
+        "iter_guardrail_ok": iter_guardrail_ok,
+        "iter_guardrail_issues": iter_guardrail_issues,
+        "iter_iterations": iter_iterations,
+        "iter_llm_status": iter_llm_status_json,
+        "delta_f1_v2_vs_v1": round((f1_nsla_v2 - f1_nsla) * 100, 2),
+        "delta_f1_iter_vs_v2": round((f1_nsla_iter - f1_nsla_v2) * 100, 2),
+        "error": case_error
+    }
+    return _CaseOutcome(
+        row=row,
+        success=success,
+        error_message=error_message,
+        f1=(f1_llm, f1_nsla, f1_nsla_v2, f1_nsla_iter),
+        bleu=(bleu_llm, bleu_nsla, bleu_nsla_v2, bleu_nsla_iter),
+        tags=tags,
+        # Campi che nel CSV vengono appiattiti in stringhe, conservati per l'artefatto JSONL
+        structured={
+            "tags": list(tags),
+            "v2_missing_links": list(v2_missing_links),
+            "v2_llm_status": v2_llm_status,
+            "iter_missing_links": list(iter_missing),
+            "iter_conflicts": list(iter_conflicts),
+            "iter_llm_status": iter_llm_status,
+        },
+        judge_future=judge_future,
+    )
+
+
+def _scoped_executor(stack: ExitStack, max_workers: int) -> ThreadPoolExecutor:
+    """
+    Crea un pool legato a `stack`: all'uscita il lavoro ancora in coda viene annullato
+    (in caso di errore i casi residui non continuano a colpire il server).
+    """
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    stack.callback(executor.shutdown, wait=True, cancel_futures=True)
+    return executor
 
 
 def run_benchmark(
@@ -281,6 +958,9 @@ def run_benchmark(
     timeout_iter: float = 900.0,
     timeout_judge: float = 300.0,
     case_ids: Optional[List[str]] = None,
+    parallel_endpoints: bool = False,
+    max_workers: int = 1,
+    jsonl_path: Optional[str] = None,
 ) -> Dict[str, Any]:
     """
     Esegue il benchmark completo con metriche avanzate.
@@ -293,8 +973,14 @@ def run_benchmark(
         use_judge: Se True invoca il judge LLM esterno.
         timeout_*: Timeout (in secondi) per le varie chiamate HTTP. Valori <= 0 disabilitano il timeout.
         case_ids: Lista opzionale di ID da eseguire (subset del file casi).
+        parallel_endpoints: Se True invia in parallelo le quattro chiamate di ogni caso.
+            Riduce il wall-clock, ma i tempi per endpoint includono la contesa sul backend.
+        max_workers: Numero di casi elaborati in parallelo (1 = esecuzione sequenziale).
+        jsonl_path: Se indicato, scrive anche un JSONL (una riga per caso) con i campi
+            annidati non appiattiti, pensato per le pipeline di analisi.
     """
     start_time = time.perf_counter()
+    run_id = _new_run_id()
     
     try:
         cases = load_cases(cases_path)
@@ -388,10 +1074,10 @@ def run_benchmark(
     n_fail = 0
     error_messages = []
     
-    total_time_llm = []
-    total_time_nsla = []
-    total_time_nsla_v2 = []
-    total_time_nsla_iter = []
+    time_llm = _RunningStat()
+    time_nsla = _RunningStat()
+    time_nsla_v2 = _RunningStat()
+    time_nsla_iter = _RunningStat()
     total_llm_correct = 0
     total_nsla_correct = 0
     total_nsla_v2_correct = 0
@@ -413,309 +1099,146 @@ def run_benchmark(
     iter_guardrail_pass = 0
     iter_guardrail_total = 0
     tag_metrics: Dict[str, Dict[str, float]] = {}
-    nsla_wins = 0
+    judge_votes: Counter = Counter()
     
-    print("Inizio benchmark avanzato...")
-    print("=" * 60)
-    
-    for case in cases:
-        case_id = case["id"]
-        question = case["question"]
-        gold_answer = case["gold_answer"]
-        tags = case.get("tags", [])
-        iter_cfg = case.get("iter", {})
-        iter_max = int(iter_cfg.get("max_iters", 3))
-        
-        # Valori di default per la riga
-        llm_only_answer = ""
-        nsla_answer = ""
-        nsla_v2_answer = ""
-        nsla_iter_answer = ""
-        verified = False
-        llm_only_correct = False
-        nsla_correct = False
-        nsla_v2_correct = False
-        nsla_iter_correct = False
-        t_llm = 0.0
-        t_nsla = 0.0
-        t_nsla_v2 = 0.0
-        t_nsla_iter = 0.0
-        case_error = None
-        em_llm = 0
-        em_nsla = 0
-        em_nsla_v2 = 0
-        em_nsla_iter = 0
-        f1_llm = 0.0
-        f1_nsla = 0.0
-        f1_nsla_v2 = 0.0
-        f1_nsla_iter = 0.0
-        bleu_llm = 0.0
-        bleu_nsla = 0.0
-        bleu_nsla_v2 = 0.0
-        bleu_nsla_iter = 0.0
-        judge_vote = "tie"
-        judge_confidence = 0.0
-        judge_rationale = ""
-        v2_judge_vote = ""
-        v2_judge_confidence = 0.0
-        v2_judge_rationale = ""
-        v2_feedback_status = ""
-        v2_missing_links = []
-        v2_guardrail_ok = None
-        v2_guardrail_issues = 0
-        v2_fallback_used = False
-        v2_explanation = ""
-        v2_feedback_v1_status = ""
-        v2_llm_status = {}
-        iter_status = ""
-        iter_missing = []
-        iter_conflicts = []
-        iter_guardrail_ok = None
-        iter_guardrail_issues = 0
-        iter_iterations = 0
-        iter_llm_status = {}
-        
-        try:
-            # Chiama gli endpoint principali
-            llm_answer, t_llm = call_llm_only(base_url, question, timeout=timeout_llm)
-            nsla_json, t_nsla = call_legal_query(base_url, question, timeout=timeout_nsla)
-            v2_json, t_nsla_v2 = call_legal_query_v2(
-                base_url,
-                question,
-                reference_answer=gold_answer,
-                timeout=timeout_v2,
-            )
-            iter_json, t_nsla_iter = call_legal_query_v2_iterative(
-                base_url,
-                question,
-                iter_max,
-                timeout=timeout_iter,
+    # Timeout normalizzati una volta sola: gli helper `call_*` li passano così come sono
+    timeouts = {
+        "llm": _prepare_timeout(timeout_llm),
+        "nsla": _prepare_timeout(timeout_nsla),
+        "v2": _prepare_timeout(timeout_v2),
+        "iter": _prepare_timeout(timeout_iter),
+    }
+    max_workers = max(1, max_workers)
+    # Richieste in volo: un worker per caso (x4 se gli endpoint vanno in parallelo) + i judge
+    judge_workers = max(2, max_workers) if use_judge else 0
+    _ensure_session_capacity(max_workers * (4 if parallel_endpoints else 1) + judge_workers)
+    # File di output ed executor vivono solo durante il ciclo dei casi e vengono chiusi
+    # anche in caso di errore o interruzione (Ctrl-C)
+    with ExitStack() as resources:
+        # Le righe vengono scritte appena calcolate: un crash a metà run non perde i casi già completati
+        csv_file = resources.enter_context(open(csv_path, 'w', newline='', encoding='utf-8'))
+        csv_writer = csv.DictWriter(csv_file, fieldnames=CSV_FIELDNAMES)
+        csv_writer.writeheader()
+        jsonl_file = resources.enter_context(open(jsonl_path, 'wb')) if jsonl_path else None
+
+        print("Inizio benchmark avanzato...")
+        print("=" * 60)
+
+        endpoint_executor = _scoped_executor(resources, 4 * max_workers) if parallel_endpoints else None
+        judge_executor = _scoped_executor(resources, judge_workers) if use_judge else None
+        run_case = partial(
+            _run_case,
+            base_url=base_url,
+            timeouts=timeouts,
+            use_bleu=use_bleu,
+            timeout_judge=_prepare_timeout(timeout_judge),
+            endpoint_executor=endpoint_executor,
+            judge_executor=judge_executor,
+        )
+        # Registrato per ultimo: chiuso per primo, prima degli executor che i casi usano
+        case_executor = _scoped_executor(resources, max_workers) if max_workers > 1 else None
+        # `map` consegna i risultati nell'ordine dei casi: il CSV resta deterministico
+        # mentre i worker lavorano in parallelo sui casi successivi.
+        outcomes = case_executor.map(run_case, cases) if case_executor is not None else map(run_case, cases)
+
+        def emit(outcome: _CaseOutcome) -> None:
+            """Completa la riga con il voto del judge, la conta e la scrive."""
+            row = outcome.row
+            if outcome.judge_future is not None:
+                judge_result = outcome.judge_future.result()
+                row["judge_vote"] = judge_result.get("vote", "tie")
+                row["judge_confidence"] = _to_float(judge_result.get("confidence"))
+                row["judge_rationale"] = judge_result.get("rationale", "") or ""
+                judge_votes[row["judge_vote"]] += 1
+
+            rows.append(row)
+            csv_writer.writerow(row)
+            csv_file.flush()
+            if jsonl_file is not None:
+                jsonl_file.write(orjson.dumps({**row, **outcome.structured}) + b"\n")
+
+            f1_llm, f1_nsla = outcome.f1[0], outcome.f1[1]
+            print(
+                f"Caso {row['id']}: LLM={row['llm_only_correct']} | NSLA={row['nsla_correct']} | "
+                f"EM LLM={row['llm_only_EM']} | EM NSLA={row['nsla_EM']} | F1 LLM={f1_llm:.3f} | "
+                f"F1 NSLA={f1_nsla:.3f} | v2Judge={row['v2_judge_vote'] or 'n/a'} | BenchJudge={row['judge_vote']}"
             )
-            
-            # Estrazione informazioni da /legal_query
-            llm_only_answer = llm_answer
-            nsla_answer = nsla_json.get("final_answer") or nsla_json.get("answer", "")
-            verified = bool(nsla_json.get("verified", False))
-            
-            # Phase 2 artifacts
-            nsla_v2_answer = v2_json.get("final_answer", "")
-            v2_feedback = v2_json.get("feedback") or {}
-            v2_feedback_status = v2_feedback.get("status", "unknown")
-            v2_missing_links = v2_feedback.get("missing_links", [])
-            v2_guardrail = v2_json.get("guardrail") or {}
-            v2_llm_status = v2_json.get("llm_status") or {}
-            v2_guardrail_ok = v2_guardrail.get("ok")
-            v2_guardrail_issues = len(v2_guardrail.get("issues", []) or [])
-            if v2_guardrail_ok is not None:
+
+        pending: Deque[_CaseOutcome] = deque()
+
+        for outcome in outcomes:
+            row = outcome.row
+            f1_llm, f1_nsla, f1_nsla_v2, f1_nsla_iter = outcome.f1
+            bleu_llm, bleu_nsla, bleu_nsla_v2, bleu_nsla_iter = outcome.bleu
+
+            time_llm.push(row["llm_only_time"])
+            time_nsla.push(row["nsla_time"])
+            time_nsla_v2.push(row["nsla_v2_time"])
+            time_nsla_iter.push(row["nsla_iter_time"])
+            if row["v2_guardrail_ok"] is not None:
                 v2_guardrail_total += 1
-                if v2_guardrail_ok:
+                if row["v2_guardrail_ok"]:
                     v2_guardrail_pass += 1
-            v2_fallback_used = bool(v2_json.get("fallback_used", False))
-            v2_explanation = (v2_json.get("explanation") or {}).get("summary", "")
-            v2_feedback_v1_status = (
-                ((v2_json.get("phase2") or {}).get("feedback_v1") or {}).get("status") or ""
-            )
-            v2_judge = v2_json.get("judge") or {}
-            if v2_judge:
-                v2_judge_vote = v2_judge.get("vote", "tie")
-                v2_judge_confidence = float(v2_judge.get("confidence", 0.0) or 0.0)
-                v2_judge_rationale = v2_judge.get("rationale", "") or ""
-
-            # Phase 3 artifacts
-            best_iter = iter_json.get("best") or {}
-            iter_history = iter_json.get("history") or []
-            iter_llm_status = iter_json.get("llm_status") or {}
-            iter_iterations = len(iter_history)
-            nsla_iter_answer = best_iter.get("final_answer", "")
-            iter_feedback = best_iter.get("feedback") or {}
-            iter_status = iter_feedback.get("status", "unknown")
-            iter_missing = iter_feedback.get("missing_links", [])
-            iter_conflicts = iter_feedback.get("conflicting_axioms", [])
-            iter_guardrail = best_iter.get("guardrail") or {}
-            iter_guardrail_ok = iter_guardrail.get("ok")
-            iter_guardrail_issues = len(iter_guardrail.get("issues", []) or [])
-            if iter_guardrail_ok is not None:
+            if row["iter_guardrail_ok"] is not None:
                 iter_guardrail_total += 1
-                if iter_guardrail_ok:
+                if row["iter_guardrail_ok"]:
                     iter_guardrail_pass += 1
-            
-            # Valutazione correctness
-            llm_only_correct = is_correct(llm_only_answer, gold_answer)
-            nsla_correct = is_correct(nsla_answer, gold_answer)
-            nsla_v2_correct = is_correct(nsla_v2_answer, gold_answer)
-            nsla_iter_correct = is_correct(nsla_iter_answer, gold_answer)
-            
-            # Calcolo EM e F1
-            em_llm = 1 if llm_only_answer.strip().lower() == gold_answer.strip().lower() else 0
-            em_nsla = 1 if nsla_answer.strip().lower() == gold_answer.strip().lower() else 0
-            em_nsla_v2 = 1 if nsla_v2_answer.strip().lower() == gold_answer.strip().lower() else 0
-            em_nsla_iter = 1 if nsla_iter_answer.strip().lower() == gold_answer.strip().lower() else 0
-            f1_llm = _f1_score(llm_only_answer, gold_answer)
-            f1_nsla = _f1_score(nsla_answer, gold_answer)
-            f1_nsla_v2 = _f1_score(nsla_v2_answer, gold_answer)
-            f1_nsla_iter = _f1_score(nsla_iter_answer, gold_answer)
-            
-            # Calcolo BLEU (se richiesto)
-            if use_bleu:
-                bleu_llm = _bleu_score_simple(llm_only_answer, gold_answer)
-                bleu_nsla = _bleu_score_simple(nsla_answer, gold_answer)
-                bleu_nsla_v2 = _bleu_score_simple(nsla_v2_answer, gold_answer)
-                bleu_nsla_iter = _bleu_score_simple(nsla_iter_answer, gold_answer)
-            
-            # Judge LLM (se richiesto)
-            if use_judge:
-                judge_result = call_judge_llm(
-                    question,
-                    llm_only_answer,
-                    nsla_v2_answer,
-                    gold_answer,
-                    base_url,
-                    timeout=timeout_judge,
-                )
-                judge_vote = judge_result.get("vote", "tie")
-                judge_confidence = float(judge_result.get("confidence", 0.0) or 0.0)
-                judge_rationale = judge_result.get("rationale", "") or ""
-                if judge_vote == "NSLA":
-                    nsla_wins += 1
-            
-            # Aggiorna statistiche
-            total_time_llm.append(t_llm)
-            total_time_nsla.append(t_nsla)
-            total_time_nsla_v2.append(t_nsla_v2)
-            total_time_nsla_iter.append(t_nsla_iter)
-            total_llm_correct += llm_only_correct
-            total_nsla_correct += nsla_correct
-            total_nsla_v2_correct += nsla_v2_correct
-            total_nsla_iter_correct += nsla_iter_correct
-            total_llm_em += em_llm
-            total_nsla_em += em_nsla
-            total_nsla_v2_em += em_nsla_v2
-            total_nsla_iter_em += em_nsla_iter
-            total_llm_f1 += f1_llm
-            total_nsla_f1 += f1_nsla
-            total_nsla_v2_f1 += f1_nsla_v2
-            total_nsla_iter_f1 += f1_nsla_iter
-            total_bleu_llm += bleu_llm
-            total_bleu_nsla += bleu_nsla
-            total_bleu_nsla_v2 += bleu_nsla_v2
-            total_bleu_nsla_iter += bleu_nsla_iter
-
-            for tag in tags:
-                tm = tag_metrics.setdefault(
-                    tag,
-                    {
-                        "cases": 0,
-                        "llm_correct": 0,
-                        "nsla_correct": 0,
-                        "nsla_v2_correct": 0,
-                        "nsla_iter_correct": 0,
-                        "llm_f1": 0.0,
-                        "nsla_f1": 0.0,
-                        "nsla_v2_f1": 0.0,
-                        "nsla_iter_f1": 0.0,
-                    },
-                )
-                tm["cases"] += 1
-                tm["llm_correct"] += int(llm_only_correct)
-                tm["nsla_correct"] += int(nsla_correct)
-                tm["nsla_v2_correct"] += int(nsla_v2_correct)
-                tm["nsla_iter_correct"] += int(nsla_iter_correct)
-                tm["llm_f1"] += f1_llm
-                tm["nsla_f1"] += f1_nsla
-                tm["nsla_v2_f1"] += f1_nsla_v2
-                tm["nsla_iter_f1"] += f1_nsla_iter
-            
-            # Caso di successo
-            n_success += 1
-            
-        except (ConnectionError, RuntimeError, RequestException) as e:
-            # Gestione errori di connessione e HTTP
-            n_fail += 1
-            case_error = str(e)
-            logger.error("Errore nel processare il caso %s: %s", case_id, e)
-            error_messages.append(f"Caso {case_id} fallito: {e}")
-            
-            # Aggiungi tempi di default per il caso fallito
-            total_time_llm.append(t_llm)
-            total_time_nsla.append(t_nsla)
-            total_time_nsla_v2.append(t_nsla_v2)
-            total_time_nsla_iter.append(t_nsla_iter)
-        except Exception as e:
-            # Gestione di altri errori imprevisti
-            n_fail += 1
-            case_error = f"Errore imprevisto: {str(e)}"
-            logger.error("Errore imprevisto nel caso %s: %s", case_id, e)
-            error_messages.append(f"Caso {case_id} fallito: {case_error}")
-            
-            # Aggiungi tempi di default
-            total_time_llm.append(t_llm)
-            total_time_nsla.append(t_nsla)
-            total_time_nsla_v2.append(t_nsla_v2)
-            total_time_nsla_iter.append(t_nsla_iter)
-        
-        # Crea la riga per questo caso
-        row = {
-            "id": case_id,
-            "tags": ",".join(tags) if tags else "",
-            "question": question,
-            "gold_answer": gold_answer,
-            "llm_only_answer": llm_only_answer,
-            "nsla_answer": nsla_answer,
-            "nsla_v2_answer": nsla_v2_answer,
-            "nsla_iter_answer": nsla_iter_answer,
-            "llm_only_correct": llm_only_correct,
-            "nsla_correct": nsla_correct,
-            "nsla_v2_correct": nsla_v2_correct,
-            "nsla_iter_correct": nsla_iter_correct,
-            "llm_only_EM": em_llm,
-            "nsla_EM": em_nsla,
-            "nsla_v2_EM": em_nsla_v2,
-            "nsla_iter_EM": em_nsla_iter,
-            "llm_only_F1": round(f1_llm * 100, 2),
-            "nsla_F1": round(f1_nsla * 100, 2),
-            "nsla_v2_F1": round(f1_nsla_v2 * 100, 2),
-            "nsla_iter_F1": round(f1_nsla_iter * 100, 2),
-            "bleu_score_llm": round(bleu_llm * 100, 2),
-            "bleu_score_nsla": round(bleu_nsla * 100, 2),
-            "bleu_score_nsla_v2": round(bleu_nsla_v2 * 100, 2),
-            "bleu_score_nsla_iter": round(bleu_nsla_iter * 100, 2),
-            "judge_vote": judge_vote,
-            "judge_confidence": judge_confidence,
-            "judge_rationale": judge_rationale,
-            "v2_judge_vote": v2_judge_vote,
-            "v2_judge_confidence": v2_judge_confidence,
-            "v2_judge_rationale": v2_judge_rationale,
-            "llm_only_time": t_llm,
-            "nsla_time": t_nsla,
-            "nsla_v2_time": t_nsla_v2,
-            "nsla_iter_time": t_nsla_iter,
-            "verified": verified,
-            "v2_feedback_status": v2_feedback_status,
-            "v2_missing_links": "|".join(v2_missing_links),
-            "v2_guardrail_ok": v2_guardrail_ok,
-            "v2_guardrail_issues": v2_guardrail_issues,
-            "v2_fallback_used": v2_fallback_used,
-            "v2_explanation": v2_explanation,
-            "v2_feedback_v1_status": v2_feedback_v1_status,
-            "v2_llm_status": json.dumps(v2_llm_status, ensure_ascii=False),
-            "iter_status": iter_status,
-            "iter_missing_links": "|".join(iter_missing),
-            "iter_conflicts": "|".join(iter_conflicts),
-            "iter_guardrail_ok": iter_guardrail_ok,
-            "iter_guardrail_issues": iter_guardrail_issues,
-            "iter_iterations": iter_iterations,
-            "iter_llm_status": json.dumps(iter_llm_status, ensure_ascii=False),
-            "delta_f1_v2_vs_v1": round((f1_nsla_v2 - f1_nsla) * 100, 2),
-            "delta_f1_iter_vs_v2": round((f1_nsla_iter - f1_nsla_v2) * 100, 2),
-            "error": case_error
-        }
-        rows.append(row)
-        
-        print(
-            f"Caso {case_id}: LLM={llm_only_correct} | NSLA={nsla_correct} | "
-            f"EM LLM={em_llm} | EM NSLA={em_nsla} | F1 LLM={f1_llm:.3f} | "
-            f"F1 NSLA={f1_nsla:.3f} | v2Judge={v2_judge_vote or 'n/a'} | BenchJudge={judge_vote}"
-        )
+
+            if outcome.success:
+                n_success += 1
+                total_llm_correct += row["llm_only_correct"]
+                total_nsla_correct += row["nsla_correct"]
+                total_nsla_v2_correct += row["nsla_v2_correct"]
+                total_nsla_iter_correct += row["nsla_iter_correct"]
+                total_llm_em += row["llm_only_EM"]
+                total_nsla_em += row["nsla_EM"]
+                total_nsla_v2_em += row["nsla_v2_EM"]
+                total_nsla_iter_em += row["nsla_iter_EM"]
+                total_llm_f1 += f1_llm
+                total_nsla_f1 += f1_nsla
+                total_nsla_v2_f1 += f1_nsla_v2
+                total_nsla_iter_f1 += f1_nsla_iter
+                total_bleu_llm += bleu_llm
+                total_bleu_nsla += bleu_nsla
+                total_bleu_nsla_v2 += bleu_nsla_v2
+                total_bleu_nsla_iter += bleu_nsla_iter
+
+                for tag in outcome.tags:
+                    # `setdefault` costruirebbe il dict di default a ogni caso anche per tag già visti
+                    tm = tag_metrics.get(tag)
+                    if tm is None:
+                        tm = tag_metrics[tag] = {
+                            "cases": 0,
+                            "llm_correct": 0,
+                            "nsla_correct": 0,
+                            "nsla_v2_correct": 0,
+                            "nsla_iter_correct": 0,
+                            "llm_f1": 0.0,
+                            "nsla_f1": 0.0,
+                            "nsla_v2_f1": 0.0,
+                            "nsla_iter_f1": 0.0,
+                        }
+                    tm["cases"] += 1
+                    tm["llm_correct"] += int(row["llm_only_correct"])
+                    tm["nsla_correct"] += int(row["nsla_correct"])
+                    tm["nsla_v2_correct"] += int(row["nsla_v2_correct"])
+                    tm["nsla_iter_correct"] += int(row["nsla_iter_correct"])
+                    tm["llm_f1"] += f1_llm
+                    tm["nsla_f1"] += f1_nsla
+                    tm["nsla_v2_f1"] += f1_nsla_v2
+                    tm["nsla_iter_f1"] += f1_nsla_iter
+            else:
+                n_fail += 1
+                error_messages.append(outcome.error_message)
+
+            # Le righe escono in ordine appena il judge del caso (se presente) ha risposto
+            pending.append(outcome)
+            while pending and (pending[0].judge_future is None or pending[0].judge_future.done()):
+                emit(pending.popleft())
+
+        while pending:
+            emit(pending.popleft())
+    nsla_wins = judge_votes["NSLA"]
     
     # Calcolo metriche aggregate
     if rows:
@@ -731,22 +1254,14 @@ def run_benchmark(
         nsla_f1 = (total_nsla_f1 / n_cases) * 100
         nsla_v2_f1 = (total_nsla_v2_f1 / n_cases) * 100
         nsla_iter_f1 = (total_nsla_iter_f1 / n_cases) * 100
-        avg_llm_only_time = sum(total_time_llm) / len(total_time_llm)
-        avg_nsla_time = sum(total_time_nsla) / len(total_time_nsla)
-        avg_nsla_v2_time = (
-            sum(total_time_nsla_v2) / len(total_time_nsla_v2) if total_time_nsla_v2 else 0.0
-        )
-        avg_nsla_iter_time = (
-            sum(total_time_nsla_iter) / len(total_time_nsla_iter) if total_time_nsla_iter else 0.0
-        )
-        llm_only_std_time = statistics.stdev(total_time_llm) if len(total_time_llm) > 1 else 0.0
-        nsla_std_time = statistics.stdev(total_time_nsla) if len(total_time_nsla) > 1 else 0.0
-        nsla_v2_std_time = (
-            statistics.stdev(total_time_nsla_v2) if len(total_time_nsla_v2) > 1 else 0.0
-        )
-        nsla_iter_std_time = (
-            statistics.stdev(total_time_nsla_iter) if len(total_time_nsla_iter) > 1 else 0.0
-        )
+        avg_llm_only_time = time_llm.mean
+        avg_nsla_time = time_nsla.mean
+        avg_nsla_v2_time = time_nsla_v2.mean
+        avg_nsla_iter_time = time_nsla_iter.mean
+        llm_only_std_time = time_llm.stdev()
+        nsla_std_time = time_nsla.stdev()
+        nsla_v2_std_time = time_nsla_v2.stdev()
+        nsla_iter_std_time = time_nsla_iter.stdev()
         bleu_llm_avg = (total_bleu_llm / n_cases) * 100 if use_bleu else 0.0
         bleu_nsla_avg = (total_bleu_nsla / n_cases) * 100 if use_bleu else 0.0
         bleu_nsla_v2_avg = (total_bleu_nsla_v2 / n_cases) * 100 if use_bleu else 0.0
@@ -779,14 +1294,6 @@ def run_benchmark(
         bleu_nsla_iter_avg = 0.0
         nsla_win_rate = 0.0
     
-    # Salvataggio risultati su CSV
-    if rows:
-        fieldnames = list(rows[0].keys())
-        with open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-            writer.writerows(rows)
-    
     total_duration = time.perf_counter() - start_time
     
     # Costruzione del risultato finale
@@ -817,6 +1324,7 @@ def run_benchmark(
         "bleu_score_nsla_v2": round(bleu_nsla_v2_avg, 2),
         "bleu_score_nsla_iter": round(bleu_nsla_iter_avg, 2),
         "nsla_win_rate": round(nsla_win_rate, 2),
+        "judge_votes": dict(judge_votes),
         "llm_only_std_time": round(llm_only_std_time, 3),
         "nsla_std_time": round(nsla_std_time, 3),
         "nsla_v2_std_time": round(nsla_v2_std_time, 3),
@@ -856,42 +1364,58 @@ def run_benchmark(
     result["tag_stats"] = tag_stats
     
     # Log della richiesta
-    _log_request("full_benchmark", f"{n_cases} casi", result, total_duration)
+    with _open_log_file(run_id) as log_file:
+        _log_request(
+            "full_benchmark",
+            f"{n_cases} casi",
+            result,
+            total_duration,
+            log_file=log_file,
+            run_id=run_id,
+        )
     
-    # Stampa del report finale
-    print("\n" + "=" * 60)
-    print("RISULTATI BENCHMARK AVANZATO")
-    print(f"Casi testati: {n_cases}")
-    print(f"Casi riusciti: {n_success}")
-    print(f"Casi falliti: {n_fail}")
-    print(f"Durata totale: {total_duration:.1f}s")
-    print(f"Accuracy LLM-only: {llm_only_accuracy*100:.2f}%")
-    print(f"Accuracy NSLA: {nsla_accuracy*100:.2f}%")
-    print(f"Accuracy NSLA v2: {nsla_v2_accuracy*100:.2f}%")
-    print(f"Accuracy NSLA iter: {nsla_iter_accuracy*100:.2f}%")
-    print(f"EM LLM-only: {llm_only_em:.2f}%")
-    print(f"EM NSLA: {nsla_em:.2f}%")
-    print(f"EM NSLA v2: {nsla_v2_em:.2f}%")
-    print(f"EM NSLA iter: {nsla_iter_em:.2f}%")
-    print(f"F1 LLM-only: {llm_only_f1:.2f}%")
-    print(f"F1 NSLA: {nsla_f1:.2f}%")
-    print(f"F1 NSLA v2: {nsla_v2_f1:.2f}%")
-    print(f"F1 NSLA iter: {nsla_iter_f1:.2f}%")
+    # Stampa del report finale: le righe vengono raccolte e scritte con un solo write
+    report = [
+        "",
+        "=" * 60,
+        "RISULTATI BENCHMARK AVANZATO",
+        f"Casi testati: {n_cases}",
+        f"Casi riusciti: {n_success}",
+        f"Casi falliti: {n_fail}",
+        f"Durata totale: {total_duration:.1f}s",
+        f"Accuracy LLM-only: {llm_only_accuracy*100:.2f}%",
+        f"Accuracy NSLA: {nsla_accuracy*100:.2f}%",
+        f"Accuracy NSLA v2: {nsla_v2_accuracy*100:.2f}%",
+        f"Accuracy NSLA iter: {nsla_iter_accuracy*100:.2f}%",
+        f"EM LLM-only: {llm_only_em:.2f}%",
+        f"EM NSLA: {nsla_em:.2f}%",
+        f"EM NSLA v2: {nsla_v2_em:.2f}%",
+        f"EM NSLA iter: {nsla_iter_em:.2f}%",
+        f"F1 LLM-only: {llm_only_f1:.2f}%",
+        f"F1 NSLA: {nsla_f1:.2f}%",
+        f"F1 NSLA v2: {nsla_v2_f1:.2f}%",
+        f"F1 NSLA iter: {nsla_iter_f1:.2f}%",
+    ]
     if use_bleu:
-        print(f"BLEU LLM-only: {bleu_llm_avg:.2f}%")
-        print(f"BLEU NSLA: {bleu_nsla_avg:.2f}%")
-        print(f"BLEU NSLA v2: {bleu_nsla_v2_avg:.2f}%")
-        print(f"BLEU NSLA iter: {bleu_nsla_iter_avg:.2f}%")
+        report += [
+            f"BLEU LLM-only: {bleu_llm_avg:.2f}%",
+            f"BLEU NSLA: {bleu_nsla_avg:.2f}%",
+            f"BLEU NSLA v2: {bleu_nsla_v2_avg:.2f}%",
+            f"BLEU NSLA iter: {bleu_nsla_iter_avg:.2f}%",
+        ]
     if use_judge:
-        print(f"NSLA Win Rate: {nsla_win_rate:.2f}%")
-    print(f"Tempo medio LLM-only: {avg_llm_only_time:.3f}s ± {llm_only_std_time:.3f}s")
-    print(f"Tempo medio NSLA: {avg_nsla_time:.3f}s ± {nsla_std_time:.3f}s")
-    print(f"Tempo medio NSLA v2: {avg_nsla_v2_time:.3f}s ± {nsla_v2_std_time:.3f}s")
-    print(f"Tempo medio NSLA iter: {avg_nsla_iter_time:.3f}s ± {nsla_iter_std_time:.3f}s")
-    print(f"Guardrail v2 OK: {v2_guardrail_rate*100:.1f}% | Iter guardrail OK: {iter_guardrail_rate*100:.1f}%")
+        report.append(f"NSLA Win Rate: {nsla_win_rate:.2f}%")
+    report += [
+        f"Tempo medio LLM-only: {avg_llm_only_time:.3f}s ± {llm_only_std_time:.3f}s",
+        f"Tempo medio NSLA: {avg_nsla_time:.3f}s ± {nsla_std_time:.3f}s",
+        f"Tempo medio NSLA v2: {avg_nsla_v2_time:.3f}s ± {nsla_v2_std_time:.3f}s",
+        f"Tempo medio NSLA iter: {avg_nsla_iter_time:.3f}s ± {nsla_iter_std_time:.3f}s",
+        f"Guardrail v2 OK: {v2_guardrail_rate*100:.1f}% | Iter guardrail OK: {iter_guardrail_rate*100:.1f}%",
+    ]
     if error_messages:
-        print(f"Errori: {len(error_messages)}")
-    print("=" * 60)
+        report.append(f"Errori: {len(error_messages)}")
+    report.append("=" * 60)
+    sys.stdout.write("\n".join(report) + "\n")
     
     return result
 
@@ -905,6 +1429,11 @@ def main():
     parser.add_argument("--cases", default="data/cases_dev.json", help="File dei casi di test")
     parser.add_argument("--output", default="data/results.csv", help="File di output CSV")
     parser.add_argument("--no-bleu", action="store_true", help="Disabilita calcolo BLEU")
+    parser.add_argument(
+        "--jsonl",
+        default=None,
+        help="File JSONL opzionale con i risultati per caso (campi annidati non appiattiti)",
+    )
     parser.add_argument("--judge", action="store_true", help="Abilita judge LLM")
     parser.add_argument(
         "--case-id",
@@ -942,6 +1471,17 @@ def main():
         default=300.0,
         help="Timeout (s) per /judge_compare.",
     )
+    parser.add_argument(
+        "--parallel-endpoints",
+        action="store_true",
+        help="Invia in parallelo le quattro chiamate di ogni caso",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Numero di casi elaborati in parallelo (default: 1, sequenziale).",
+    )
     
     args = parser.parse_args()
     
@@ -958,6 +1498,9 @@ def main():
             timeout_iter=args.timeout_iter,
             timeout_judge=args.timeout_judge,
             case_ids=args.case_ids,
+            parallel_endpoints=args.parallel_endpoints,
+            max_workers=args.workers,
+            jsonl_path=args.jsonl,
         )
         print(f"\nBenchmark completato! Risultati salvati in {args.output}")
     except Exception as e:
@@ -1,14 +1,20 @@
 from __future__ import annotations
 
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
 import logging
+import re
 
 from .logic_dsl import SORTS
 from .models import LogicProgram
 
 logger = logging.getLogger(__name__)
 
+# "Name(arg1, arg2)": everything before the first "(" is the predicate name,
+# the body runs up to the trailing ")".
+_ATOM_RE = re.compile(r"([^(]*?)\s*\((.*)\)", re.DOTALL)
+_ARG_SPLIT_RE = re.compile(r"\s*,\s*")
+
 
 def ensure_canonical_query_rule(program: LogicProgram) -> None:
     """
@@ -26,8 +32,9 @@ def ensure_canonical_query_rule(program: LogicProgram) -> None:
     if not builder:
         return
 
-    program.rules = list(program.rules or [])
-    if _has_rule_for_query(program.rules, raw_query):
+    if program.rules is None:
+        program.rules = []
+    if raw_query in _rule_conclusions(program.rules):
         return
 
     rule = builder(program, args)
@@ -43,17 +50,41 @@ def ensure_canonical_query_rule(program: LogicProgram) -> None:
 # Builders
 # --------------------------------------------------------------------------- #
 
+_TMPL_CONTRATTO_VALIDO = (
+    "(and Consenso({p}, {c}) "
+    "CapacitaContrattuale({p}) "
+    "CausaLegittima({c}) "
+    "OggettoDeterminato({c}) "
+    "FormaPrescritta({c}))"
+)
+_TMPL_RESPONSABILITA_CONTRATTUALE = (
+    "(and HaObbligo({deb}, {cred}, {obb}) "
+    "Inadempimento({deb}, {obb}) "
+    "DannoPatrimoniale({cred}) "
+    "Imputabilita({deb}, {obb}))"
+)
+_TMPL_CONTRATTO_ADESIONE = (
+    "(and PredeterminatoDa({contratto}, {professionista}) "
+    "NonNegoziabileDa({contratto}, {consumatore}) "
+    "PuoSoloAccettareOppureRifiutare({consumatore}, {contratto}))"
+)
+_TMPL_USUCAPIONE_ORDINARIA = (
+    "(and PossessoContinuato({soggetto}, {bene}) "
+    "PossessoPubblico({soggetto}, {bene}) "
+    "BuonaFede({soggetto}))"
+)
+_TMPL_USUCAPIONE_ABBREVIATA = (
+    "(and PossessoContinuato({soggetto}, {bene}) "
+    "PossessoPubblico({soggetto}, {bene}) "
+    "BuonaFede({soggetto}) "
+    "TitoloIdoneo({titolo}, {bene}))"
+)
+
 
 def _build_rule_contratto_valido(program: LogicProgram, args: List[str]) -> Optional[Dict[str, str]]:
     if len(args) != 2:
         return None
-    condition = (
-        f"(and Consenso({args[0]}, {args[1]}) "
-        f"CapacitaContrattuale({args[0]}) "
-        f"CausaLegittima({args[1]}) "
-        f"OggettoDeterminato({args[1]}) "
-        f"FormaPrescritta({args[1]}))"
-    )
+    condition = _TMPL_CONTRATTO_VALIDO.format(p=args[0], c=args[1])
     conclusion = _build_conclusion("ContrattoValido", args)
     return {"condition": condition, "conclusion": conclusion}
 
@@ -63,12 +94,7 @@ def _build_rule_responsabilita_contrattuale(
 ) -> Optional[Dict[str, str]]:
     if len(args) != 3:
         return None
-    condition = (
-        f"(and HaObbligo({args[0]}, {args[1]}, {args[2]}) "
-        f"Inadempimento({args[0]}, {args[2]}) "
-        f"DannoPatrimoniale({args[1]}) "
-        f"Imputabilita({args[0]}, {args[2]}))"
-    )
+    condition = _TMPL_RESPONSABILITA_CONTRATTUALE.format(deb=args[0], cred=args[1], obb=args[2])
     conclusion = _build_conclusion("ResponsabilitaContrattuale", args)
     return {"condition": condition, "conclusion": conclusion}
 
@@ -77,12 +103,11 @@ def _build_rule_contratto_adesione(program: LogicProgram, args: List[str]) -> Op
     if len(args) != 1:
         return None
     contratto = args[0]
-    professionista = _ensure_constant(program, f"{contratto}_professionista", "Professionista")
-    consumatore = _ensure_constant(program, f"{contratto}_consumatore", "Consumatore")
-    condition = (
-        f"(and PredeterminatoDa({contratto}, {professionista}) "
-        f"NonNegoziabileDa({contratto}, {consumatore}) "
-        f"PuoSoloAccettareOppureRifiutare({consumatore}, {contratto}))"
+    by_sort = _constants_by_sort(program)
+    professionista = _ensure_constant(program, f"{contratto}_professionista", "Professionista", by_sort)
+    consumatore = _ensure_constant(program, f"{contratto}_consumatore", "Consumatore", by_sort)
+    condition = _TMPL_CONTRATTO_ADESIONE.format(
+        contratto=contratto, professionista=professionista, consumatore=consumatore
     )
     conclusion = _build_conclusion("ContrattoAdesione", args)
     return {"condition": condition, "conclusion": conclusion}
@@ -91,11 +116,7 @@ def _build_rule_contratto_adesione(program: LogicProgram, args: List[str]) -> Op
 def _build_rule_usucapione_ordinaria(program: LogicProgram, args: List[str]) -> Optional[Dict[str, str]]:
     if len(args) != 2:
         return None
-    condition = (
-        f"(and PossessoContinuato({args[0]}, {args[1]}) "
-        f"PossessoPubblico({args[0]}, {args[1]}) "
-        f"BuonaFede({args[0]}))"
-    )
+    condition = _TMPL_USUCAPIONE_ORDINARIA.format(soggetto=args[0], bene=args[1])
     conclusion = _build_conclusion("UsucapioneOrdinaria", args)
     return {"condition": condition, "conclusion": conclusion}
 
@@ -104,12 +125,7 @@ def _build_rule_usucapione_abbreviata(program: LogicProgram, args: List[str]) ->
     if len(args) != 2:
         return None
     titolo = _ensure_constant(program, f"titolo_{args[1]}", "Titolo")
-    condition = (
-        f"(and PossessoContinuato({args[0]}, {args[1]}) "
-        f"PossessoPubblico({args[0]}, {args[1]}) "
-        f"BuonaFede({args[0]}) "
-        f"TitoloIdoneo({titolo}, {args[1]}))"
-    )
+    condition = _TMPL_USUCAPIONE_ABBREVIATA.format(soggetto=args[0], bene=args[1], titolo=titolo)
     conclusion = _build_conclusion("UsucapioneAbbreviata", args)
     return {"condition": condition, "conclusion": conclusion}
 
@@ -144,23 +160,17 @@ def _extract_query_atom(query: object) -> Optional[Tuple[str, str, List[str]]]:
     if not text:
         return None
 
-    if "(" not in text or not text.endswith(")"):
+    match = _ATOM_RE.fullmatch(text)
+    if match is None:
         return text, text, []
 
-    name, args_str = text.split("(", 1)
-    name = name.strip()
-    args_body = args_str[:-1]  # remove trailing ")"
-    args = [arg.strip() for arg in args_body.split(",") if arg.strip()]
+    name, args_body = match.groups()
+    args = [arg for arg in _ARG_SPLIT_RE.split(args_body.strip()) if arg]
     return text, name, args
 
 
-def _has_rule_for_query(rules: List[Dict[str, str]], target_conclusion: str) -> bool:
-    for rule in rules:
-        if not isinstance(rule, dict):
-            continue
-        if (rule.get("conclusion") or "").strip() == target_conclusion:
-            return True
-    return False
+def _rule_conclusions(rules: List[Dict[str, str]]) -> Set[str]:
+    return {(rule.get("conclusion") or "").strip() for rule in rules if isinstance(rule, dict)}
 
 
 def _build_conclusion(predicate: str, args: List[str]) -> str:
@@ -170,29 +180,59 @@ def _build_conclusion(predicate: str, args: List[str]) -> str:
     return f"{predicate}()"
 
 
-def _ensure_constant(program: LogicProgram, base_name: str, sort_name: str) -> str:
-    program.constants = dict(program.constants or {})
-    program.sorts = dict(program.sorts or {})
+def _constants_by_sort(program: LogicProgram) -> Dict[str, str]:
+    """Map each sort to the first constant declared with it."""
+    by_sort: Dict[str, str] = {}
+    for name, meta in (program.constants or {}).items():
+        sort_name = _resolve_sort(meta.get("sort"))
+        if sort_name is not None:
+            by_sort.setdefault(sort_name, name)
+    return by_sort
+
 
-    for name, meta in program.constants.items():
-        if _resolve_sort(meta.get("sort")) == sort_name:
-            return name
+def _ensure_constant(
+    program: LogicProgram,
+    base_name: str,
+    sort_name: str,
+    by_sort: Optional[Dict[str, str]] = None,
+) -> str:
+    """
+    Return a constant of ``sort_name``, declaring ``base_name`` if none exists.
+
+    Builders that need several constants pass the same ``by_sort`` index
+    (see ``_constants_by_sort``); it is kept up to date as constants are added.
+    """
+    # The program owns its containers: fill in missing ones instead of
+    # copying the whole dict on every builder call.
+    if program.constants is None:
+        program.constants = {}
+    if program.sorts is None:
+        program.sorts = {}
+    constants = program.constants
+    if by_sort is None:
+        by_sort = _constants_by_sort(program)
+
+    existing = by_sort.get(sort_name)
+    if existing is not None:
+        return existing
 
     candidate = base_name
     idx = 1
-    while candidate in program.constants:
+    while candidate in constants:
         idx += 1
         candidate = f"{base_name}_{idx}"
 
-    program.constants[candidate] = {"sort": sort_name}
+    constants[candidate] = {"sort": sort_name}
+    by_sort[sort_name] = candidate
     _ensure_sort_definition(program, sort_name)
     return candidate
 
 
 def _ensure_sort_definition(program: LogicProgram, sort_name: str) -> None:
-    if sort_name in (program.sorts or {}):
+    if program.sorts is None:
+        program.sorts = {}
+    if sort_name in program.sorts:
         return
-    program.sorts = dict(program.sorts or {})
     spec = SORTS.get(sort_name)
     if spec and spec.extends:
         program.sorts[sort_name] = {"type": spec.extends}
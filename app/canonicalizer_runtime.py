@@ -16,7 +16,8 @@ from __future__ import annotations
 
 import logging
 import time
-from typing import Dict, Optional, Tuple
+from collections import OrderedDict
+from typing import Optional, Tuple
 
 from .models_v2 import CanonicalizerOutput
 
@@ -32,6 +33,8 @@ class CanonicalizerRuntime:
             dummy helper ``_build_dummy_canonicalizer_output``.
         enable_cache: Whether to cache canonicalizations by normalized question.
         cache_ttl: Optional TTL (seconds) for cached entries. ``None`` disables TTL.
+        cache_size: Maximum number of cached questions; the least recently used
+            entry is evicted first.
     """
 
     def __init__(
@@ -39,11 +42,13 @@ class CanonicalizerRuntime:
         llm_client,
         enable_cache: bool = True,
         cache_ttl: Optional[float] = 600.0,
+        cache_size: int = 1024,
     ) -> None:
         self.llm_client = llm_client
         self.enable_cache = enable_cache
         self.cache_ttl = cache_ttl
-        self._cache: Dict[str, Tuple[float, CanonicalizerOutput]] = {}
+        self.cache_size = max(1, cache_size)
+        self._cache: OrderedDict[str, Tuple[float, CanonicalizerOutput]] = OrderedDict()
 
     # ------------------------------------------------------------------ #
     # Public API
@@ -120,15 +125,19 @@ class CanonicalizerRuntime:
             return None
 
         timestamp, value = cached
-        if self.cache_ttl is not None and (time.time() - timestamp) > self.cache_ttl:
+        if self.cache_ttl is not None and (time.monotonic() - timestamp) > self.cache_ttl:
             del self._cache[key]
             return None
+        self._cache.move_to_end(key)
         return value
 
     def _store_in_cache(self, key: str, value: CanonicalizerOutput) -> None:
         if not self.enable_cache:
             return
-        self._cache[key] = (time.time(), value)
+        self._cache[key] = (time.monotonic(), value)
+        self._cache.move_to_end(key)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
 
 
 __all__ = ["CanonicalizerRuntime"]
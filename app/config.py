@@ -1,10 +1,11 @@
 # app/config.py
+from dataclasses import dataclass
 from functools import lru_cache
-from pydantic import BaseModel
 from typing import Optional
 
 
-class Settings(BaseModel):
+@dataclass(frozen=True, slots=True)
+class Settings:
     """
     Configurazione centrale (M0) condivisa da tutti i moduli.
 
@@ -13,6 +14,9 @@ class Settings(BaseModel):
     - use_cloud / use_local_model: flag rapidi per orchestrare il backend
     - enable_symbolic_layer: abilita/disabilita translator + Z3
     - benchmark_mode: abilita percorsi e logging specifici per benchmark
+
+    Dataclass immutabile: l'istanza è condivisa da tutto il processo via
+    `get_settings()` e l'accesso ai campi è un semplice slot.
     """
 
     llm_backend: str = "dummy"
@@ -28,6 +32,6 @@ class Settings(BaseModel):
 
 @lru_cache
 def get_settings() -> Settings:
-    # Se vuoi, puoi aggiungere qui il caricamento da .env via pydantic-settings
-    # senza dipendenze aggiuntive per ora usiamo solo i default.
+    # Se vuoi, puoi aggiungere qui il caricamento da .env / variabili d'ambiente
+    # passando i valori al costruttore; per ora usiamo solo i default.
     return Settings()
@@ -18,6 +18,27 @@ from typing import Dict, Any
 from .logic_feedback import LogicFeedback
 from .models_v2 import ExplanationOutput, GuardrailResult
 
+_SUMMARY_GUARDRAIL_FAILED = (
+    "Il programma logico generato non ha superato i controlli di sicurezza. "
+    "È stata mantenuta la risposta precedente oppure è richiesto un nuovo refinement."
+)
+_SUMMARY_CONSISTENT_ENTAILS = (
+    "Il sistema simbolico è coerente e la conclusione proposta è dimostrata "
+    "dalle regole modellate. "
+    "Risposta finale: "
+    "{final_answer}"
+)
+_SUMMARY_CONSISTENT_NO_ENTAILMENT = (
+    "Il programma logico è coerente ma non implica ancora la conclusione. "
+    "Mancano collegamenti o premesse aggiuntive. "
+    "Feedback sintetico: {human_summary}"
+)
+_SUMMARY_INCONSISTENT = (
+    "Il solver ha rilevato un conflitto logico nelle regole generate. "
+    "È necessario correggere le premesse: "
+    "{human_summary}"
+)
+
 
 def synthesize_explanation(
     question: str,
@@ -38,45 +59,24 @@ def synthesize_explanation(
         ExplanationOutput with summary text and status.
     """
 
+    details: Dict[str, Any] = {"question": question, "final_answer": final_answer}
+
     if not guardrail.ok:
-        summary = (
-            "Il programma logico generato non ha superato i controlli di sicurezza. "
-            "È stata mantenuta la risposta precedente oppure è richiesto un nuovo refinement."
+        details["guardrail_issues"] = [issue.message for issue in guardrail.issues]
+        return ExplanationOutput(
+            summary=_SUMMARY_GUARDRAIL_FAILED, status="guardrail_failed", details=details
         )
-        details: Dict[str, Any] = {
-            "question": question,
-            "final_answer": final_answer,
-            "guardrail_issues": [issue.message for issue in guardrail.issues],
-        }
-        return ExplanationOutput(summary=summary, status="guardrail_failed", details=details)
 
     status = feedback.status
     if status == "consistent_entails":
-        summary = (
-            "Il sistema simbolico è coerente e la conclusione proposta è dimostrata "
-            "dalle regole modellate. "
-            "Risposta finale: "
-            f"{final_answer}"
-        )
+        summary = _SUMMARY_CONSISTENT_ENTAILS.format(final_answer=final_answer)
     elif status == "consistent_no_entailment":
-        summary = (
-            "Il programma logico è coerente ma non implica ancora la conclusione. "
-            "Mancano collegamenti o premesse aggiuntive. "
-            f"Feedback sintetico: {feedback.human_summary}"
-        )
+        summary = _SUMMARY_CONSISTENT_NO_ENTAILMENT.format(human_summary=feedback.human_summary)
     else:  # inconsistent
-        summary = (
-            "Il solver ha rilevato un conflitto logico nelle regole generate. "
-            "È necessario correggere le premesse: "
-            f"{feedback.human_summary}"
-        )
+        summary = _SUMMARY_INCONSISTENT.format(human_summary=feedback.human_summary)
 
-    details = {
-        "question": question,
-        "final_answer": final_answer,
-        "missing_links": feedback.missing_links,
-        "conflicting_axioms": feedback.conflicting_axioms,
-    }
+    details["missing_links"] = feedback.missing_links
+    details["conflicting_axioms"] = feedback.conflicting_axioms
 
     return ExplanationOutput(summary=summary, status=status, details=details)
 
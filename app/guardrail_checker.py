@@ -14,7 +14,10 @@ or retry.
 
 from __future__ import annotations
 
-from typing import Dict, List
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 
 from .models import LogicProgram
 from .models_v2 import GuardrailIssue, GuardrailResult
@@ -36,10 +39,99 @@ from .ontology_utils import (
 )
 
 
+@lru_cache(maxsize=256)
+def _cached_sort_alias(name: str) -> str:
+    return resolve_sort_alias(name)
+
+
+@lru_cache(maxsize=256)
+def _cached_predicate_alias(name: str) -> str:
+    return resolve_predicate_alias(name)
+
+
+def _resolve_sort(name: Any) -> str:
+    # LLM output may carry non-string sorts: only hashable strings go through the cache
+    if isinstance(name, str):
+        return _cached_sort_alias(name)
+    return resolve_sort_alias(name)
+
+
+def _resolve_predicate(name: Any) -> str:
+    if isinstance(name, str):
+        return _cached_predicate_alias(name)
+    return resolve_predicate_alias(name)
+
+
 def _build_issue(code: str, message: str, details: dict | None = None) -> GuardrailIssue:
     return GuardrailIssue(code=code, message=message, details=details)
 
 
+# Outcome of validating one rule: None when it parses, else (issue code, message).
+_RuleCheck = Optional[Tuple[str, str]]
+
+_RULE_CHECK_CACHE_SIZE = 4096
+_rule_checks: "OrderedDict[Tuple[Any, ...], _RuleCheck]" = OrderedDict()
+_rule_checks_lock = threading.Lock()
+_MISSING = object()
+
+
+def _clear_rule_checks() -> None:
+    """Drop every memoized rule check (tests, or after changing the parser)."""
+    with _rule_checks_lock:
+        _rule_checks.clear()
+
+
+def _parse_rule(parser: DSL21Parser, rule: Any) -> _RuleCheck:
+    try:
+        parser.parse_rules([rule])
+    except UnknownPredicateError as exc:
+        return ("RULE_UNKNOWN_PREDICATE", str(exc))
+    except DSLParseError as exc:
+        return ("RULE_PARSE_ERROR", str(exc))
+    return None
+
+
+def _predicate_signature(parser: DSL21Parser) -> Tuple[Tuple[str, int], ...]:
+    return tuple(sorted((name, decl.arity()) for name, decl in parser.predicates.items()))
+
+
+def _check_rules(parser: DSL21Parser, rules: List[Any]) -> _RuleCheck:
+    """
+    Validate rules like ``parser.parse_rules``, stopping at the first error.
+
+    Strict parsing of a condition/conclusion rule does not touch the parser
+    state, so its outcome depends only on the rule text and on the declared
+    predicates: it is memoized across guardrail runs, since the refinement loop
+    re-validates largely identical rule sets. Other shapes (definitions,
+    malformed entries) are parsed permissively and always go to the parser.
+    """
+    signature = None
+    for rule in rules:
+        if not (isinstance(rule, dict) and "condition" in rule and "conclusion" in rule):
+            outcome = _parse_rule(parser, rule)
+            if outcome is not None:
+                return outcome
+            signature = None  # a definition may have declared new predicates
+            continue
+
+        if signature is None:
+            signature = _predicate_signature(parser)
+        key = (signature, str(rule["condition"]).strip(), str(rule["conclusion"]).strip())
+        with _rule_checks_lock:
+            outcome = _rule_checks.get(key, _MISSING)
+            if outcome is not _MISSING:
+                _rule_checks.move_to_end(key)
+        if outcome is _MISSING:
+            outcome = _parse_rule(parser, rule)
+            with _rule_checks_lock:
+                _rule_checks[key] = outcome
+                if len(_rule_checks) > _RULE_CHECK_CACHE_SIZE:
+                    _rule_checks.popitem(last=False)
+        if outcome is not None:
+            return outcome
+    return None
+
+
 def run_guardrail(logic_program: LogicProgram) -> GuardrailResult:
     """
     Execute Phase 2.4 guardrail checks.
@@ -48,7 +140,8 @@ def run_guardrail(logic_program: LogicProgram) -> GuardrailResult:
         logic_program: LogicProgram instance (dsl_version 2.1) to validate.
 
     Returns:
-        GuardrailResult with ok flag and issue list.
+        GuardrailResult with ok flag and issue list. A DSL version mismatch is
+        reported on its own, without running the remaining checks.
     """
 
     issues: List[GuardrailIssue] = []
@@ -62,16 +155,27 @@ def run_guardrail(logic_program: LogicProgram) -> GuardrailResult:
                 {"actual": logic_program.dsl_version, "expected": CANONICAL_DSL_VERSION},
             )
         )
+        # A program in another DSL version is rejected as a whole: parsing it
+        # against the v2.1 tables would only pile up derived issues.
+        return GuardrailResult(ok=False, issues=issues)
 
     parser = DSL21Parser(allow_auto_declare=False)
 
+    # Canonical tables and resolvers are hit for every sort, constant and
+    # predicate argument below: bind them to locals once.
+    known_sorts = SORTS
+    known_predicates = PREDICATES
+    resolve_sort = _resolve_sort
+    resolve_predicate = _resolve_predicate
+    build_issue = _build_issue
+
     canonical_sorts: Dict[str, dict] = {}
     for sort_name, sort_meta in (logic_program.sorts or {}).items():
-        canonical_name = resolve_sort_alias(sort_name)
+        canonical_name = resolve_sort(sort_name)
         canonical_sorts[canonical_name] = sort_meta
-        if canonical_name not in SORTS:
+        if canonical_name not in known_sorts:
             issues.append(
-                _build_issue(
+                build_issue(
                     "UNKNOWN_SORT_DECLARATION",
                     f"Sort '{sort_name}' is not part of the canonical DSL.",
                     {"sort": sort_name},
@@ -84,10 +188,10 @@ def run_guardrail(logic_program: LogicProgram) -> GuardrailResult:
         sort_name = const_meta.get("sort")
         if not sort_name:
             continue
-        canonical_sort = resolve_sort_alias(sort_name)
-        if canonical_sort not in SORTS:
+        canonical_sort = resolve_sort(sort_name)
+        if canonical_sort not in known_sorts:
             issues.append(
-                _build_issue(
+                build_issue(
                     "UNKNOWN_CONSTANT_SORT",
                     f"Constant '{const_name}' references unknown sort '{sort_name}'.",
                     {"constant": const_name, "sort": sort_name},
@@ -98,11 +202,11 @@ def run_guardrail(logic_program: LogicProgram) -> GuardrailResult:
     declared_predicates = logic_program.predicates or {}
     canonical_predicates: Dict[str, dict] = {}
     for pred_name, meta in declared_predicates.items():
-        canonical_name = resolve_predicate_alias(pred_name)
-        spec = PREDICATES.get(canonical_name)
+        canonical_name = resolve_predicate(pred_name)
+        spec = known_predicates.get(canonical_name)
         if not spec:
             issues.append(
-                _build_issue(
+                build_issue(
                     "UNKNOWN_PREDICATE_DECLARATION",
                     f"Predicate '{pred_name}' is not part of the canonical DSL.",
                     {"predicate": pred_name},
@@ -114,7 +218,7 @@ def run_guardrail(logic_program: LogicProgram) -> GuardrailResult:
         actual_arity = int(meta.get("arity", expected_arity))
         if expected_arity != actual_arity:
             issues.append(
-                _build_issue(
+                build_issue(
                     "PREDICATE_ARITY_MISMATCH",
                     f"Predicate '{canonical_name}' arity mismatch (expected {expected_arity}, got {actual_arity}).",
                     {"predicate": canonical_name, "expected": expected_arity, "actual": actual_arity},
@@ -125,11 +229,11 @@ def run_guardrail(logic_program: LogicProgram) -> GuardrailResult:
         sorts = meta.get("sorts") or list(spec.args)
         canonical_sorts_meta = []
         for idx, sort_name in enumerate(sorts):
-            canonical_sort = resolve_sort_alias(sort_name)
+            canonical_sort = resolve_sort(sort_name)
             canonical_sorts_meta.append(canonical_sort)
-            if canonical_sort not in SORTS:
+            if canonical_sort not in known_sorts:
                 issues.append(
-                    _build_issue(
+                    build_issue(
                         "PREDICATE_SORT_UNKNOWN",
                         f"Predicate '{canonical_name}' references unknown sort '{sort_name}'.",
                         {"predicate": canonical_name, "sort": sort_name},
@@ -152,28 +256,20 @@ def run_guardrail(logic_program: LogicProgram) -> GuardrailResult:
         parser.parse_predicates(canonical_predicates)
     except InvalidArityError as exc:
         issues.append(
-            _build_issue(
+            build_issue(
                 "INVALID_ARITY",
                 str(exc),
                 {"context": "parse_predicates"},
             )
         )
 
-    try:
-        parser.parse_rules(logic_program.rules or [])
-    except UnknownPredicateError as exc:
-        issues.append(
-            _build_issue(
-                "RULE_UNKNOWN_PREDICATE",
-                str(exc),
-                {"context": "parse_rules"},
-            )
-        )
-    except DSLParseError as exc:
+    rule_error = _check_rules(parser, logic_program.rules or [])
+    if rule_error is not None:
+        code, message = rule_error
         issues.append(
-            _build_issue(
-                "RULE_PARSE_ERROR",
-                str(exc),
+            build_issue(
+                code,
+                message,
                 {"context": "parse_rules"},
             )
         )
@@ -183,7 +279,7 @@ def run_guardrail(logic_program: LogicProgram) -> GuardrailResult:
             parser._parse_expression(str(logic_program.query), strict=True)  # type: ignore[attr-defined]
         except (UnknownPredicateError, DSLParseError) as exc:
             issues.append(
-                _build_issue(
+                build_issue(
                     "QUERY_PARSE_ERROR",
                     str(exc),
                     {"context": "parse_query"},
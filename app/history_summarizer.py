@@ -8,6 +8,9 @@ from typing import List
 
 from .models_v2 import IterationState
 
+_HEADER = "Contesto iterativo (più recente alla fine):"
+_EMPTY_HISTORY = "Nessuna iterazione precedente: questa è la prima proposta."
+
 
 class HistorySummarizer:
     """
@@ -15,31 +18,41 @@ class HistorySummarizer:
 
     The summary is intentionally deterministic to guarantee reproducible prompts
     (important for tests and offline benchmarking).
+
+    Entries are append-only: ``format_entry`` renders one iteration and never
+    changes once written, so a caller that keeps the rendered entries across
+    iterations (see ``IterationManager``) only formats the newest one and the
+    prompt prefix stays byte-identical until the window starts sliding.
     """
 
+    __slots__ = ()
+
     def summarize(self, history: List[IterationState], max_entries: int = 3) -> str:
         """
         Summarize the last ``max_entries`` iterations (default: 3).
         """
-        if not history:
-            return "Nessuna iterazione precedente: questa è la prima proposta."
-
-        tail = history[-max_entries:]
-        lines = [
-            "Contesto iterativo (più recente alla fine):",
-        ]
-
-        for state in tail:
-            missing = ", ".join(state.feedback.missing_links) or "nessuno"
-            conflicts = ", ".join(state.feedback.conflicting_axioms) or "nessuno"
-            lines.append(
-                f"- iter {state.iteration}: status={state.feedback.status}; "
-                f"missing={missing}; conflicts={conflicts}; "
-                f"summary={state.feedback.human_summary}"
-            )
-
-        return "\n".join(lines)
+        return self.join_entries(
+            [self.format_entry(state) for state in history[-max_entries:]],
+            max_entries=max_entries,
+        )
+
+    def format_entry(self, state: IterationState) -> str:
+        """Render the summary line of a single iteration."""
+        missing = ", ".join(state.feedback.missing_links) or "nessuno"
+        conflicts = ", ".join(state.feedback.conflicting_axioms) or "nessuno"
+        return (
+            f"- iter {state.iteration}: status={state.feedback.status}; "
+            f"missing={missing}; conflicts={conflicts}; "
+            f"summary={state.feedback.human_summary}"
+        )
+
+    def join_entries(self, entries: List[str], max_entries: int = 3) -> str:
+        """
+        Assemble a summary from already rendered entries (oldest first).
+        """
+        if not entries:
+            return _EMPTY_HISTORY
+        return "\n".join([_HEADER, *entries[-max_entries:]])
 
 
 __all__ = ["HistorySummarizer"]
-
@@ -7,8 +7,11 @@ prompt to ``RefinementRuntime`` and summarizing states via ``HistorySummarizer``
 
 from __future__ import annotations
 
+import copy
+import hashlib
+import json
 import logging
-from typing import Callable, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
 from .history_summarizer import HistorySummarizer
 from .logic_feedback import LogicFeedback, build_logic_feedback
@@ -22,6 +25,10 @@ logger = logging.getLogger(__name__)
 
 FeedbackBuilder = Callable[[object, LogicProgram, object], LogicFeedback]
 SolverBuilder = Callable[[LogicProgram, dict], Tuple[object, object]]
+# (status, sorted missing links, sorted conflicting axioms) of one iteration's feedback
+FeedbackFingerprint = Tuple[str, Tuple[str, ...], Tuple[str, ...]]
+# (program dump after the feedback postprocessor, final feedback) of one checked program
+CachedCheck = Tuple[dict, LogicFeedback]
 
 
 class IterationManager:
@@ -29,6 +36,17 @@ class IterationManager:
     Execute the bounded iterative refinement loop (Phase 3).
     """
 
+    __slots__ = (
+        "refinement_runtime",
+        "config",
+        "history_summarizer",
+        "solver_builder",
+        "feedback_builder",
+        "program_sanitizer",
+        "program_hydrator",
+        "feedback_postprocessor",
+    )
+
     def __init__(
         self,
         refinement_runtime: RefinementRuntime,
@@ -62,6 +80,13 @@ class IterationManager:
         Execute the loop and return (best_state, history).
         """
         history: List[IterationState] = []
+        # Outcome of every program already checked in this run, keyed by the digest
+        # of the program as proposed (before the feedback postprocessor augments it)
+        feedback_cache: Dict[str, CachedCheck] = {}
+        # Parallel to `history`: computed once per iteration for the fixpoint check
+        fingerprints: List[FeedbackFingerprint] = []
+        # Rendered once per iteration: the summary only grows by its newest line
+        summary_entries: List[str] = []
 
         # Iteration 0 uses the structured extractor output as baseline
         self._append_iteration(
@@ -71,16 +96,19 @@ class IterationManager:
             base_program=initial_program,
             feedback=initial_feedback,
             previous_answer=initial_answer,
+            feedback_cache=feedback_cache,
+            fingerprints=fingerprints,
+            summary_entries=summary_entries,
         )
 
-        while not self._should_stop(history):
+        while not self._should_stop(history, fingerprints):
             iter_idx = len(history)
-            summary = self.history_summarizer.summarize(history)
+            summary = self.history_summarizer.join_entries(summary_entries)
             prev_state = history[-1]
-            base_program_dict = self._prepare_logic_program_dict(prev_state.llm_output.logic_program)
-            base_program = LogicProgram(**base_program_dict)
-            self._postprocess_program(base_program)
-            ensure_canonical_query_rule(base_program)
+            # The previous program was already validated, sanitized, hydrated and completed
+            # with its canonical query rule in `_append_iteration`: its dump is trusted, so
+            # rebuild the model without running validation again.
+            base_program = LogicProgram.model_construct(**prev_state.llm_output.logic_program)
 
             self._append_iteration(
                 history=history,
@@ -90,6 +118,9 @@ class IterationManager:
                 feedback=prev_state.feedback,
                 previous_answer=prev_state.llm_output.final_answer,
                 history_summary=summary,
+                feedback_cache=feedback_cache,
+                fingerprints=fingerprints,
+                summary_entries=summary_entries,
             )
 
             if len(history) >= self.config.max_iters:
@@ -110,6 +141,9 @@ class IterationManager:
         feedback: LogicFeedback,
         previous_answer: Optional[str],
         history_summary: Optional[str] = None,
+        feedback_cache: Optional[Dict[str, CachedCheck]] = None,
+        fingerprints: Optional[List[FeedbackFingerprint]] = None,
+        summary_entries: Optional[List[str]] = None,
     ) -> None:
         llm_output = self.refinement_runtime.run(
             question=question,
@@ -123,11 +157,33 @@ class IterationManager:
         logic_program = LogicProgram(**logic_dict)
         self._postprocess_program(logic_program)
         ensure_canonical_query_rule(logic_program)
-        solver, query = self.solver_builder(logic_program, facts={})
-        next_feedback = self.feedback_builder(solver, logic_program, query)
-        if self.feedback_postprocessor:
-            next_feedback = self.feedback_postprocessor(logic_program, next_feedback)
-        llm_output.logic_program = logic_program.model_dump()
+
+        # The LLM often proposes a program it already produced earlier in the run:
+        # its Z3 feedback is deterministic, so the checked program and its feedback
+        # are reused instead of re-solved.
+        cache_key = (
+            self._program_key(logic_program.model_dump())
+            if feedback_cache is not None
+            else None
+        )
+        cached = feedback_cache.get(cache_key) if cache_key is not None else None
+        if cached is None:
+            solver, query = self.solver_builder(logic_program, facts={})
+            if self.config.solver_params:
+                solver.set(**self.config.solver_params)
+            next_feedback = self.feedback_builder(solver, logic_program, query)
+            if self.feedback_postprocessor:
+                # May augment the program (e.g. synthesized facts): dump it afterwards
+                next_feedback = self.feedback_postprocessor(logic_program, next_feedback)
+            program_dump = logic_program.model_dump()
+            if cache_key is not None:
+                feedback_cache[cache_key] = (program_dump, next_feedback)
+        else:
+            logger.debug("Iteration %d reuses feedback of an identical program", iteration_index)
+            cached_dump, next_feedback = cached
+            # Each iteration state owns its program dump
+            program_dump = copy.deepcopy(cached_dump)
+        llm_output.logic_program = program_dump
 
         metrics = IterationMetrics(
             iteration=iteration_index,
@@ -135,16 +191,31 @@ class IterationManager:
             is_best=next_feedback.status == "consistent_entails",
         )
 
-        history.append(
-            IterationState(
-                iteration=iteration_index,
-                llm_output=llm_output,
-                feedback=next_feedback,
-                metrics=metrics,
-            )
+        state = IterationState(
+            iteration=iteration_index,
+            llm_output=llm_output,
+            feedback=next_feedback,
+            metrics=metrics,
         )
+        history.append(state)
+        if fingerprints is not None:
+            fingerprints.append(self._feedback_fingerprint(next_feedback))
+        if summary_entries is not None:
+            summary_entries.append(self.history_summarizer.format_entry(state))
 
-    def _should_stop(self, history: List[IterationState]) -> bool:
+    @staticmethod
+    def _feedback_fingerprint(feedback: LogicFeedback) -> FeedbackFingerprint:
+        return (
+            feedback.status,
+            tuple(sorted(feedback.missing_links)),
+            tuple(sorted(feedback.conflicting_axioms)),
+        )
+
+    def _should_stop(
+        self,
+        history: List[IterationState],
+        fingerprints: List[FeedbackFingerprint],
+    ) -> bool:
         if not history:
             return False
 
@@ -155,17 +226,9 @@ class IterationManager:
         if len(history) >= self.config.max_iters:
             return True
 
-        if len(history) >= 2:
-            prev_state = history[-2]
-            if (
-                prev_state.feedback.status == last_state.feedback.status
-                and sorted(prev_state.feedback.missing_links)
-                == sorted(last_state.feedback.missing_links)
-                and sorted(prev_state.feedback.conflicting_axioms)
-                == sorted(last_state.feedback.conflicting_axioms)
-            ):
-                # No logical change between consecutive iterations
-                return True
+        if len(history) >= 2 and fingerprints[-2] == fingerprints[-1]:
+            # No logical change between consecutive iterations
+            return True
 
         return False
 
@@ -183,6 +246,12 @@ class IterationManager:
         # Otherwise return the last iteration
         return history[-1]
 
+    @staticmethod
+    def _program_key(program_dump: dict) -> str:
+        """Stable content digest of a normalized logic program."""
+        payload = json.dumps(program_dump, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
     @staticmethod
     def _prepare_logic_program_dict(raw: object) -> dict:
         if not isinstance(raw, dict):
@@ -191,7 +260,7 @@ class IterationManager:
 
         facts = data.get("facts")
         if isinstance(facts, list):
-            data["facts"] = {fact: True for fact in facts if isinstance(fact, str)}
+            data["facts"] = dict.fromkeys((fact for fact in facts if isinstance(fact, str)), True)
         elif not isinstance(facts, dict):
             data["facts"] = {}
 
@@ -1,12 +1,17 @@
 from __future__ import annotations
 
 import logging
-from typing import Optional
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Mapping, Optional, Sequence, Tuple
 
 from .models_v2 import JudgeLLMResult
 
 logger = logging.getLogger(__name__)
 
+JudgeCacheKey = Tuple[str, Optional[str], str, str, str, str]
+
 
 class JudgeRuntime:
     """
@@ -14,11 +19,31 @@ class JudgeRuntime:
 
     Wraps the `LLMClient.call_judge_metric` helper and provides
     graceful fallbacks when the judge is disabled or unavailable.
+
+    With ``enable_cache=True`` verdicts are kept in an in-memory LRU keyed by
+    their full input tuple, so re-judging the same pair within one process
+    (e.g. a fixed baseline in a benchmark sweep) does not hit the LLM again.
+    Error fallbacks and dummy-backend ties are not cached, and a hit returns a
+    copy of the stored verdict. Reuse across processes is covered by the
+    persistent LLM response cache (``NSLA_LLM_RESPONSE_CACHE``).
     """
 
-    def __init__(self, llm_client, *, enabled: bool = True) -> None:
+    __slots__ = ("llm_client", "enabled", "enable_cache", "cache_size", "_cache", "_cache_lock")
+
+    def __init__(
+        self,
+        llm_client,
+        *,
+        enabled: bool = True,
+        enable_cache: bool = False,
+        cache_size: int = 1024,
+    ) -> None:
         self.llm_client = llm_client
         self.enabled = enabled
+        self.enable_cache = enable_cache
+        self.cache_size = max(1, cache_size)
+        self._cache: OrderedDict[JudgeCacheKey, JudgeLLMResult] = OrderedDict()
+        self._cache_lock = threading.Lock()
 
     def evaluate(
         self,
@@ -54,8 +79,14 @@ class JudgeRuntime:
                 confidence=0.0,
             )
 
+        key: JudgeCacheKey = (question, reference_answer, answer_a, answer_b, label_a, label_b)
+        cached = self._get_from_cache(key)
+        if cached is not None:
+            logger.debug("Judge cache hit (len(question)=%d)", len(question))
+            return cached.model_copy()
+
         try:
-            return self.llm_client.call_judge_metric(
+            result = self.llm_client.call_judge_metric(
                 question=question,
                 reference_answer=reference_answer,
                 answer_a=answer_a,
@@ -77,6 +108,60 @@ class JudgeRuntime:
                 confidence=0.0,
             )
 
+        # The dummy backend answers with a placeholder tie: not a verdict to reuse
+        if getattr(self.llm_client, "backend", None) != "dummy":
+            self._store_in_cache(key, result.model_copy())
+        return result
+
+    def evaluate_batch(
+        self,
+        items: Sequence[Mapping[str, Any]],
+        *,
+        max_workers: int = 8,
+    ) -> List[JudgeLLMResult]:
+        """
+        Evaluate several judge inputs concurrently.
+
+        Each item holds the keyword arguments accepted by `evaluate`. Judge calls
+        are network-bound, so they are fanned out on a thread pool; results are
+        returned in input order and failures degrade to the usual `tie` result.
+
+        Args:
+            items: Sequence of `evaluate` keyword-argument mappings.
+            max_workers: Maximum number of concurrent judge calls.
+        """
+
+        if not items:
+            return []
+        if not self.enabled or max_workers <= 1 or len(items) == 1:
+            return [self.evaluate(**item) for item in items]
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+            return list(executor.map(lambda item: self.evaluate(**item), items))
+
+    def clear_cache(self) -> None:
+        """Clear the verdict cache (useful for tests)."""
+        with self._cache_lock:
+            self._cache.clear()
+
+    def _get_from_cache(self, key: JudgeCacheKey) -> Optional[JudgeLLMResult]:
+        if not self.enable_cache:
+            return None
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+            return cached
+
+    def _store_in_cache(self, key: JudgeCacheKey, value: JudgeLLMResult) -> None:
+        if not self.enable_cache:
+            return
+        with self._cache_lock:
+            self._cache[key] = value
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
 
 __all__ = ["JudgeRuntime"]
 
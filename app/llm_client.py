@@ -7,7 +7,8 @@ Client LLM per NSLA v1/v2.
   - ask_llm_structured / ask_llm_structured_raw: risposta strutturata (LLMOutput)
 - Supporta due backend:
   - "dummy" (default, usato nei test e quando non vogliamo chiamare davvero il modello)
-  - "ollama" (usa `ollama run <model>` via subprocess)
+  - "ollama" (usa l'API HTTP locale di Ollama, `POST /api/generate`; con
+    NSLA_OLLAMA_USE_HTTP=0 torna a `ollama run <model>` via subprocess)
 
 L'obiettivo principale è:
 - NON far fallire i test se l'LLM non è disponibile
@@ -16,16 +17,23 @@ L'obiettivo principale è:
 
 from __future__ import annotations
 
-import copy
+import functools
+import hashlib
 import json
 import logging
 import os
 import random
 import re
 import subprocess
+import tempfile
+import threading
 import time
-from collections import defaultdict
-from typing import Any, Dict, Optional, Tuple
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+import orjson
 
 from .config import Settings, get_settings
 from .models import LLMOutput, LogicProgram
@@ -34,9 +42,213 @@ from .logic_feedback import LogicFeedback
 from .prompt_loader import get_prompt_loader
 from .canonical_rule_utils import ensure_canonical_query_rule
 
+if TYPE_CHECKING:  # httpx viene importato solo quando serve davvero (backend ollama)
+    import httpx
+
 logger = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True, slots=True)
+class _RuntimeCfg:
+    """Variabili d'ambiente NSLA_* del client LLM, già ripulite e convertite."""
+
+    backend: Optional[str]
+    ollama_bin: str
+    model_name: str
+    ollama_use_http: bool
+    ollama_url: str
+    ollama_keep_alive: str
+    max_retries: int
+    retry_delay: float
+    max_retry_delay: float
+    retry_jitter: float
+    response_cache_enabled: bool
+    response_cache_size: int
+    response_cache_dir: Optional[Path]
+
+
+@functools.cache
+def _runtime_cfg() -> _RuntimeCfg:
+    """
+    Legge (una volta per processo) le variabili d'ambiente NSLA_* del client LLM.
+
+    `LLMClient.__init__` si limita a copiarne i valori; usare
+    `LLMClient.reload_env()` se l'ambiente cambia a runtime.
+    """
+    backend = os.getenv("NSLA_LLM_BACKEND")
+    cache_dir = (os.getenv("NSLA_LLM_RESPONSE_CACHE_DIR") or "").strip()
+    return _RuntimeCfg(
+        backend=None if backend is None else (backend.strip() or "dummy"),
+        ollama_bin=(os.getenv("NSLA_OLLAMA_BIN", "ollama") or "ollama").strip(),
+        model_name=(os.getenv("NSLA_OLLAMA_MODEL", "llama3") or "llama3").strip() or "llama3",
+        ollama_use_http=os.getenv("NSLA_OLLAMA_USE_HTTP", "1").strip() != "0",
+        ollama_url=(
+            os.getenv("NSLA_OLLAMA_URL", "http://localhost:11434") or "http://localhost:11434"
+        ).strip().rstrip("/"),
+        ollama_keep_alive=(os.getenv("NSLA_OLLAMA_KEEP_ALIVE", "10m") or "").strip(),
+        max_retries=int(os.getenv("NSLA_LLM_MAX_RETRIES", "3")),
+        retry_delay=float(os.getenv("NSLA_LLM_RETRY_DELAY", "1.0")),
+        max_retry_delay=float(os.getenv("NSLA_LLM_MAX_RETRY_DELAY", "30.0")),
+        retry_jitter=min(max(float(os.getenv("NSLA_LLM_RETRY_JITTER", "0.5")), 0.0), 1.0),
+        response_cache_enabled=os.getenv("NSLA_LLM_RESPONSE_CACHE", "0").strip() == "1",
+        response_cache_size=max(1, int(os.getenv("NSLA_LLM_RESPONSE_CACHE_SIZE", "512"))),
+        response_cache_dir=Path(cache_dir) if cache_dir else None,
+    )
+
+# Pattern usati da `_extract_json_from_text` (compilati una sola volta)
+_RE_JSON_FENCE = re.compile(r'```json\s*')
+_RE_FENCE = re.compile(r'```\s*')
+# Gli unici caratteri rilevanti per la scansione delle graffe
+_RE_JSON_SCAN = re.compile(r'[{}"\\]')
+# Messaggi di errore che indicano throttling del backend
+_RE_THROTTLE = re.compile(r"429|didn't generate first token", re.IGNORECASE)
+# Connettivi Unicode -> sintassi testuale del DSL usata da `_sanitize_expression`
+_SANITIZE_REPLACEMENTS = (
+    ("∨", " or "),
+    ("∧", " and "),
+    ("¬", " not "),
+    ("→", " -> "),
+    ("⇒", " -> "),
+)
+
+
+def _json_object_candidates(text: str) -> List[str]:
+    """
+    Restituisce i blocchi `{ ... }` di primo livello presenti nel testo, in ordine.
+
+    Scansione lineare con una pila delle graffe aperte che ignora quelle contenute
+    nelle stringhe JSON (inclusi gli escape `\\"`). Una graffa che non si chiude mai
+    (graffa spuria o output troncato) non nasconde i blocchi al suo interno: sono
+    candidati i blocchi chiusi senza genitore o il cui genitore resta aperto.
+    """
+    openers: List[int] = []
+    # (inizio, fine, graffa genitore oppure -1) di ogni blocco chiuso, in ordine di chiusura
+    closed: List[Tuple[int, int, int]] = []
+    in_string = False
+    escaped = -1  # posizione del carattere preceduto da `\` nella stringa corrente
+    # Il motore regex salta in C tutto il testo irrilevante tra un carattere
+    # interessante e l'altro: in Python si visitano solo graffe, apici e `\`.
+    for match in _RE_JSON_SCAN.finditer(text):
+        i = match.start()
+        ch = text[i]
+        if in_string:
+            if i == escaped:
+                continue
+            if ch == "\\":
+                escaped = i + 1
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            if openers:
+                in_string = True
+        elif ch == "{":
+            openers.append(i)
+        elif ch == "}" and openers:
+            start = openers.pop()
+            closed.append((start, i, openers[-1] if openers else -1))
+    # I blocchi candidati sono disgiunti: l'ordine di chiusura è anche l'ordine nel testo
+    unclosed = set(openers)
+    return [
+        text[start:end + 1]
+        for start, end, parent in closed
+        if parent == -1 or parent in unclosed
+    ]
+
+
+def _is_clean_expression(value: Any) -> bool:
+    """
+    True se `value` è già nella forma prodotta da `_sanitize_expression`
+    (stringa ASCII non vuota, senza spazi superflui).
+    """
+    return (
+        type(value) is str
+        and value.isascii()
+        and value != ""
+        and " ".join(value.split()) == value
+    )
+
+
+def _is_canonical_logic_program(program: Dict[str, Any]) -> bool:
+    """
+    Verifica se il logic program (già completato con i default) ha esattamente
+    la forma che `_normalize_logic_program_dict` restituirebbe, ad esempio
+    quando l'LLM ripropone un programma di un'iterazione precedente.
+    """
+    for key in ("sorts", "constants", "predicates", "facts"):
+        if type(program[key]) is not dict:
+            return False
+    if isinstance(program.get("query"), dict):
+        return False
+    axioms = program["axioms"]
+    rules = program["rules"]
+    if type(axioms) is not list or type(rules) is not list:
+        return False
+    for entry in axioms:
+        if (
+            type(entry) is not dict
+            or len(entry) != 1
+            or not _is_clean_expression(entry.get("formula"))
+        ):
+            return False
+    for entry in rules:
+        if (
+            type(entry) is not dict
+            or len(entry) != 3
+            or "id" not in entry
+            or not _is_clean_expression(entry.get("condition"))
+            or not _is_clean_expression(entry.get("conclusion"))
+        ):
+            return False
+    return True
+
+
+@functools.cache
+def _dummy_logic_program_snapshot() -> bytes:
+    """
+    Snapshot JSON del LogicProgram dummy (con la regola canonica per la query).
+    """
+    program = LogicProgram(
+        dsl_version="2.1",
+        sorts={
+            "Soggetto": {"type": "Entity"},
+            "Debitore": {"type": "Soggetto"},
+            "Creditore": {"type": "Soggetto"},
+            "Contratto": {"type": "Entity"},
+            "Danno": {"type": "Entity"},
+            "Evento": {"type": "Entity"},
+        },
+        constants={
+            "deb_dummy": {"sort": "Debitore"},
+            "cred_dummy": {"sort": "Creditore"},
+            "contratto_dummy": {"sort": "Contratto"},
+            "danno_dummy": {"sort": "Danno"},
+            "evento_dummy": {"sort": "Evento"},
+        },
+        predicates={
+            "HaObbligo": {"arity": 3, "sorts": ["Debitore", "Creditore", "Contratto"]},
+            "Inadempimento": {"arity": 2, "sorts": ["Debitore", "Contratto"]},
+            "DannoPatrimoniale": {"arity": 1, "sorts": ["Danno"]},
+            "Imputabilita": {"arity": 2, "sorts": ["Debitore", "Contratto"]},
+            "ResponsabilitaContrattuale": {
+                "arity": 3,
+                "sorts": ["Debitore", "Creditore", "Contratto"],
+            },
+            "Consenso": {"arity": 2, "sorts": ["Soggetto", "Contratto"]},
+            "CapacitaContrattuale": {"arity": 1, "sorts": ["Soggetto"]},
+            "CausaLegittima": {"arity": 1, "sorts": ["Contratto"]},
+            "OggettoDeterminato": {"arity": 1, "sorts": ["Contratto"]},
+            "FormaPrescritta": {"arity": 1, "sorts": ["Contratto"]},
+            "ContrattoValido": {"arity": 2, "sorts": ["Debitore", "Contratto"]},
+        },
+        facts={},
+        axioms=[],
+        rules=[],
+        query="ResponsabilitaContrattuale(deb_dummy, cred_dummy, contratto_dummy)",
+    )
+    ensure_canonical_query_rule(program)
+    return orjson.dumps(program.model_dump())
+
+
 class LLMCallError(RuntimeError):
     def __init__(self, operation: str, reason: str, original: Exception):
         super().__init__(f"{operation} failed due to {reason}: {original}")
@@ -54,30 +266,37 @@ class LLMClient:
       Questo è il comportamento di default, pensato per i test.
     - Per usare davvero Ollama:
         esporta NSLA_LLM_BACKEND=ollama
-        (e opzionalmente NSLA_OLLAMA_MODEL, NSLA_OLLAMA_BIN)
+        (e opzionalmente NSLA_OLLAMA_MODEL, NSLA_OLLAMA_URL, NSLA_OLLAMA_KEEP_ALIVE,
+        NSLA_OLLAMA_USE_HTTP=0 + NSLA_OLLAMA_BIN per usare la CLI)
     """
 
     def __init__(self, settings: Optional[Settings] = None) -> None:
         # Carica le impostazioni globali, se disponibili
         self.settings = settings or get_settings()
+        cfg = _runtime_cfg()
 
         # Backend: dummy (default) oppure ollama
         # 1. prova a leggere da settings.llm_backend se esiste
-        backend = getattr(self.settings, "llm_backend", None) or "dummy"
-        # Override via ENV se disponibile
-        backend_env = os.getenv("NSLA_LLM_BACKEND", backend)
-        backend_clean = (backend_env or "dummy").strip()
-        self.backend = backend_clean or "dummy"
+        # 2. override via ENV se disponibile
+        backend = cfg.backend
+        if backend is None:
+            backend = (getattr(self.settings, "llm_backend", None) or "dummy").strip() or "dummy"
+        self.backend = backend
 
         # Rileva se siamo sotto pytest: in tal caso forziamo il dummy
+        # (letta qui: la variabile esiste solo mentre un test è in esecuzione)
         if os.getenv("PYTEST_CURRENT_TEST"):
             self.backend = "dummy"
 
         # Parametri per Ollama (usati solo se backend == "ollama")
-        self.ollama_bin = (os.getenv("NSLA_OLLAMA_BIN", "ollama") or "ollama").strip()
-        model_env = os.getenv("NSLA_OLLAMA_MODEL", "llama3")
-        model_clean = (model_env or "llama3").strip()
-        self.model_name = model_clean or "llama3"
+        self.ollama_bin = cfg.ollama_bin
+        self.model_name = cfg.model_name
+        # API HTTP del server Ollama (il modello resta caricato tra una chiamata e l'altra)
+        self.ollama_use_http = cfg.ollama_use_http
+        self.ollama_url = cfg.ollama_url
+        self.ollama_keep_alive = cfg.ollama_keep_alive
+        self._http: Optional[httpx.Client] = None
+        self._http_lock = threading.Lock()
 
         # Tracking
         self._last_structured_stats: Dict[str, Any] = {}
@@ -87,8 +306,17 @@ class LLMClient:
         self.prompt_loader = get_prompt_loader()
 
         # Retry configuration
-        self.max_retries = int(os.getenv("NSLA_LLM_MAX_RETRIES", "3"))
-        self.retry_delay = float(os.getenv("NSLA_LLM_RETRY_DELAY", "1.0"))
+        self.max_retries = cfg.max_retries
+        self.retry_delay = cfg.retry_delay
+        self.max_retry_delay = cfg.max_retry_delay
+        self.retry_jitter = cfg.retry_jitter
+
+        # Cache opzionale delle risposte (utile per sweep di valutazione ripetuti)
+        self.response_cache_enabled = cfg.response_cache_enabled
+        self.response_cache_size = cfg.response_cache_size
+        self.response_cache_dir: Optional[Path] = cfg.response_cache_dir
+        self._response_cache: OrderedDict[str, str] = OrderedDict()
+        self._response_cache_lock = threading.Lock()
 
         logger.info(
             "LLMClient inizializzato. Backend=%s, Model=%s, MaxRetries=%d",
@@ -97,6 +325,11 @@ class LLMClient:
             self.max_retries,
         )
 
+    @classmethod
+    def reload_env(cls) -> None:
+        """Rilegge le variabili d'ambiente NSLA_* per i client creati in seguito."""
+        _runtime_cfg.cache_clear()
+
     # ------------------------------------------------------------------
     # JSON Extraction Utilities
     # ------------------------------------------------------------------
@@ -105,77 +338,44 @@ class LLMClient:
         Robust JSON extraction from LLM response.
         
         Strategies:
-        1. Try parsing the entire text as JSON
-        2. Find first { ... } block and parse it
-        3. Find last { ... } block and parse it
-        4. Try to fix common JSON issues (trailing commas, etc.)
+        1. Try parsing the entire text as JSON (only when it is a bare {...} object)
+        2. Scan the top-level { ... } blocks once and parse the first one,
+           then the others starting from the last (LLMs often add prose after)
+        3. Remove markdown code fences and try again
         
         Returns:
             Parsed JSON dict or None if extraction fails
         """
         text = text.strip()
         
-        # Strategy 1: Try parsing entire text
-        try:
-            return json.loads(text)
-        except json.JSONDecodeError:
-            pass
-        
-        # Strategy 2: Find first { ... } block
-        first_brace = text.find("{")
-        if first_brace != -1:
-            # Find matching closing brace
-            brace_count = 0
-            for i in range(first_brace, len(text)):
-                if text[i] == "{":
-                    brace_count += 1
-                elif text[i] == "}":
-                    brace_count -= 1
-                    if brace_count == 0:
-                        candidate = text[first_brace:i+1]
-                        try:
-                            return json.loads(candidate)
-                        except json.JSONDecodeError:
-                            pass
-                        break
+        # Strategy 1: Fast path for an already clean {...} object. Text with a
+        # preamble or trailing prose would only fail after a full parse.
+        if text.startswith("{") and text.endswith("}"):
+            try:
+                return orjson.loads(text)
+            except json.JSONDecodeError:
+                pass
         
-        # Strategy 3: Find last { ... } block (sometimes LLM adds explanation after)
-        last_brace = text.rfind("}")
-        if last_brace != -1:
-            # Find matching opening brace
-            brace_count = 0
-            for i in range(last_brace, -1, -1):
-                if text[i] == "}":
-                    brace_count += 1
-                elif text[i] == "{":
-                    brace_count -= 1
-                    if brace_count == 0:
-                        candidate = text[i:last_brace+1]
-                        try:
-                            return json.loads(candidate)
-                        except json.JSONDecodeError:
-                            pass
-                        break
+        # Strategy 2: Top-level { ... } blocks (first, then from the last backwards)
+        candidates = _json_object_candidates(text)
+        if candidates:
+            for candidate in (candidates[0], *reversed(candidates[1:])):
+                try:
+                    return orjson.loads(candidate)
+                except json.JSONDecodeError:
+                    pass
         
-        # Strategy 4: Remove markdown code blocks and try again
-        text_cleaned = re.sub(r'```json\s*', '', text)
-        text_cleaned = re.sub(r'```\s*', '', text_cleaned)
+        # Strategy 3: Remove markdown code blocks and try again
+        text_cleaned = _RE_JSON_FENCE.sub('', text)
+        text_cleaned = _RE_FENCE.sub('', text_cleaned)
         text_cleaned = text_cleaned.strip()
         
         # Try parsing cleaned text
         try:
-            return json.loads(text_cleaned)
+            return orjson.loads(text_cleaned)
         except json.JSONDecodeError:
             pass
         
-        # Strategy 5: Try to find JSON-like structure with regex (last resort)
-        json_match = re.search(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', text, re.DOTALL)
-        if json_match:
-            try:
-                return json.loads(json_match.group(0))
-            except json.JSONDecodeError:
-                pass
-        
         return None
 
     def _call_llm_with_retry(
@@ -225,10 +425,11 @@ class LLMClient:
                 )
                 
                 if attempt < self.max_retries:
-                    delay = self.retry_delay * (2 ** (attempt - 1))
-                    jitter = random.uniform(0, self.retry_delay)
+                    # Backoff esponenziale limitato, con jitter moltiplicativo
+                    base = min(self.retry_delay * (2 ** (attempt - 1)), self.max_retry_delay)
+                    delay = base * random.uniform(1 - self.retry_jitter, 1 + self.retry_jitter)
                     logger.info("Retrying in %.1f seconds...", delay)
-                    time.sleep(delay + jitter)
+                    time.sleep(delay)
                 else:
                     logger.error(
                         "%s failed after %d attempts. Last error: %s",
@@ -243,6 +444,148 @@ class LLMClient:
     # Backend primitives
     # ------------------------------------------------------------------
     def _call_ollama(self, prompt: str, timeout: int = 300) -> str:
+        """
+        Invia il prompt a Ollama e restituisce il testo generato.
+
+        Con NSLA_LLM_RESPONSE_CACHE=1 le risposte vengono riusate per prompt
+        identici (stesso modello), anche tra esecuzioni diverse se è impostato
+        NSLA_LLM_RESPONSE_CACHE_DIR.
+        """
+        cache_key = self._response_cache_key(prompt) if self.response_cache_enabled else None
+        if cache_key is not None:
+            cached = self._get_cached_response(cache_key)
+            if cached is not None:
+                logger.debug("LLM response cache hit (%s)", cache_key)
+                return cached
+
+        if self.ollama_use_http:
+            response = self._call_ollama_http(prompt, timeout=timeout)
+        else:
+            response = self._call_ollama_cli(prompt, timeout=timeout)
+
+        if cache_key is not None:
+            self._store_cached_response(cache_key, response)
+        return response
+
+    def _response_cache_key(self, prompt: str) -> str:
+        payload = f"{self.backend}\x00{self.model_name}\x00{prompt}".encode("utf-8")
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+    def _get_cached_response(self, key: str) -> Optional[str]:
+        with self._response_cache_lock:
+            cached = self._response_cache.get(key)
+            if cached is not None:
+                self._response_cache.move_to_end(key)
+                return cached
+
+        if self.response_cache_dir is None:
+            return None
+        try:
+            cached = (self.response_cache_dir / f"{key}.txt").read_text(encoding="utf-8")
+        except OSError:
+            return None
+        if not cached.strip():
+            # Una risposta vuota non è mai valida (il backend solleva "empty"): cache miss
+            return None
+        self._store_cached_response(key, cached, persist=False)
+        return cached
+
+    def _store_cached_response(self, key: str, response: str, persist: bool = True) -> None:
+        with self._response_cache_lock:
+            self._response_cache[key] = response
+            self._response_cache.move_to_end(key)
+            if len(self._response_cache) > self.response_cache_size:
+                self._response_cache.popitem(last=False)
+
+        if persist and self.response_cache_dir is not None:
+            try:
+                self._write_cache_file(self.response_cache_dir / f"{key}.txt", response)
+            except OSError as e:
+                logger.warning("Impossibile salvare la risposta LLM in cache: %s", e)
+
+    @staticmethod
+    def _write_cache_file(path: Path, content: str) -> None:
+        """
+        Scrittura atomica: file temporaneo nella stessa directory + `os.replace`.
+        Lettori concorrenti (worker del benchmark, judge in batch) vedono il file
+        vecchio o quello completo, mai uno troncato, anche dopo un crash a metà.
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as tmp:
+                tmp.write(content)
+            os.replace(tmp_name, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
+
+    def _call_ollama_http(self, prompt: str, timeout: int = 300) -> str:
+        """
+        Chiama `POST /api/generate` sul server Ollama riusando la stessa connessione.
+        """
+        import httpx
+
+        logger.debug("Calling ollama HTTP API model=%s", self.model_name)
+        body: Dict[str, Any] = {"model": self.model_name, "prompt": prompt, "stream": False}
+        if self.ollama_keep_alive:
+            # Tiene il modello in memoria tra chiamate ravvicinate (es. sweep del judge)
+            body["keep_alive"] = self.ollama_keep_alive
+        try:
+            response = self._get_http_client().post(
+                "/api/generate",
+                json=body,
+                timeout=timeout,
+            )
+            response.raise_for_status()
+        except httpx.TimeoutException as e:
+            logger.error("Ollama timed out: %s", e)
+            raise LLMCallError("Ollama", "timeout", e) from e
+        except httpx.HTTPStatusError as e:
+            logger.error("Ollama HTTP error: %s", e)
+            reason = "throttled" if e.response.status_code == 429 else "error"
+            raise LLMCallError("Ollama", reason, e) from e
+        except httpx.TransportError as e:
+            logger.error("Ollama connection error: %s", e)
+            raise LLMCallError("Ollama", "connection", e) from e
+
+        try:
+            payload = response.json()
+        except ValueError as e:
+            raise LLMCallError("Ollama", "error", e) from e
+        if not isinstance(payload, dict):
+            raise LLMCallError(
+                "Ollama",
+                "error",
+                ValueError(f"Unexpected Ollama response body: {type(payload).__name__}"),
+            )
+        stdout = str(payload.get("response") or "").strip()
+        if not stdout:
+            raise LLMCallError("Ollama", "empty", RuntimeError("Ollama returned empty response"))
+        return stdout
+
+    def _get_http_client(self) -> httpx.Client:
+        """
+        Client HTTP condiviso, creato al primo uso.
+
+        Le chiamate concorrenti (es. `JudgeRuntime.evaluate_batch` o i worker del
+        benchmark) condividono lo stesso pool di connessioni: Ollama le serve in
+        parallelo fino a `OLLAMA_NUM_PARALLEL`.
+        """
+        client = self._http
+        if client is None:
+            import httpx
+
+            with self._http_lock:
+                if self._http is None:
+                    self._http = httpx.Client(base_url=self.ollama_url)
+                client = self._http
+        return client
+
+    def _call_ollama_cli(self, prompt: str, timeout: int = 300) -> str:
         """
         Chiama `ollama run <model_name>` con il prompt dato e restituisce stdout.
         """
@@ -264,7 +607,7 @@ class LLMClient:
         except subprocess.CalledProcessError as e:
             stderr = (e.stderr or "").strip()
             logger.error("Ollama process error: %s", stderr)
-            reason = "throttled" if "429" in stderr or "didn't generate first token" in stderr.lower() else "error"
+            reason = "throttled" if _RE_THROTTLE.search(stderr) else "error"
             raise LLMCallError("Ollama", reason, e) from e
 
         stdout = result.stdout.strip()
@@ -296,53 +639,15 @@ class LLMClient:
         - la query finale con la relativa regola legale
         in modo che i missing_links risultino informativi.
         """
-        program = LogicProgram(
-            dsl_version="2.1",
-            sorts={
-                "Soggetto": {"type": "Entity"},
-                "Debitore": {"type": "Soggetto"},
-                "Creditore": {"type": "Soggetto"},
-                "Contratto": {"type": "Entity"},
-                "Danno": {"type": "Entity"},
-                "Evento": {"type": "Entity"},
-            },
-            constants={
-                "deb_dummy": {"sort": "Debitore"},
-                "cred_dummy": {"sort": "Creditore"},
-                "contratto_dummy": {"sort": "Contratto"},
-                "danno_dummy": {"sort": "Danno"},
-                "evento_dummy": {"sort": "Evento"},
-            },
-            predicates={
-                "HaObbligo": {"arity": 3, "sorts": ["Debitore", "Creditore", "Contratto"]},
-                "Inadempimento": {"arity": 2, "sorts": ["Debitore", "Contratto"]},
-                "DannoPatrimoniale": {"arity": 1, "sorts": ["Danno"]},
-                "Imputabilita": {"arity": 2, "sorts": ["Debitore", "Contratto"]},
-                "ResponsabilitaContrattuale": {
-                    "arity": 3,
-                    "sorts": ["Debitore", "Creditore", "Contratto"],
-                },
-                "Consenso": {"arity": 2, "sorts": ["Soggetto", "Contratto"]},
-                "CapacitaContrattuale": {"arity": 1, "sorts": ["Soggetto"]},
-                "CausaLegittima": {"arity": 1, "sorts": ["Contratto"]},
-                "OggettoDeterminato": {"arity": 1, "sorts": ["Contratto"]},
-                "FormaPrescritta": {"arity": 1, "sorts": ["Contratto"]},
-                "ContrattoValido": {"arity": 2, "sorts": ["Debitore", "Contratto"]},
-            },
-            facts={},
-            axioms=[],
-            rules=[],
-            query="ResponsabilitaContrattuale(deb_dummy, cred_dummy, contratto_dummy)",
-        )
-        ensure_canonical_query_rule(program)
-        return program
+        # Il programma non dipende dalla domanda: viene costruito una sola volta e
+        # ogni chiamata ne decodifica una copia indipendente dallo snapshot JSON.
+        return LogicProgram.model_validate(orjson.loads(_dummy_logic_program_snapshot()))
 
     @staticmethod
     def _build_dummy_llm_output(question: str) -> Dict[str, Any]:
         """
         Crea un JSON compatibile con LLMOutput per i test.
         """
-        lp = LLMClient._build_dummy_logic_program(question)
         return {
             "final_answer": (
                 "Risposta generica (modalità dummy) alla domanda: "
@@ -353,7 +658,7 @@ class LLMClient:
                 "Le parti sono identificate in modo astratto.",
             ],
             "conclusion": "Contratto valido a fini dimostrativi.",
-            "logic_program": lp.model_dump(),
+            "logic_program": orjson.loads(_dummy_logic_program_snapshot()),
         }
 
     @staticmethod
@@ -482,14 +787,19 @@ class LLMClient:
 
     def ask_llm_structured_raw(self, question: str) -> str:
         """
-        Versione 'raw' che restituisce la stringa JSON così come prodotta
+        Versione 'raw' che restituisce la stringa JSON prodotta dall'LLM
         (o costruita dal dummy) per la struttura LLMOutput.
         """
         logger.debug("ask_llm_structured_raw called (backend=%s)", self.backend)
+        return orjson.dumps(self._ask_llm_structured_data(question)).decode("utf-8")
 
+    def _ask_llm_structured_data(self, question: str) -> Dict[str, Any]:
+        """
+        Interroga l'LLM e restituisce il dict JSON per LLMOutput, già parsato
+        (una sola volta) oppure il dummy in caso di risposta non valida.
+        """
         if self.backend == "dummy":
-            dummy = self._build_dummy_llm_output(question)
-            return json.dumps(dummy, ensure_ascii=False)
+            return self._build_dummy_llm_output(question)
 
         # Backend ollama: costruiamo un prompt che richiede esplicitamente il JSON
         schema = """
@@ -521,37 +831,25 @@ Lo schema è il seguente:
 
         raw = self._call_ollama(prompt)
 
-        # Alcuni modelli aggiungono testo prima/dopo: proviamo a estrarre l'oggetto JSON principale
-        raw_stripped = raw.strip()
-        first_brace = raw_stripped.find("{")
-        last_brace = raw_stripped.rfind("}")
-        if first_brace != -1 and last_brace != -1 and last_brace > first_brace:
-            candidate = raw_stripped[first_brace : last_brace + 1]
-        else:
-            # Se non troviamo nulla, fallback su dummy
+        # Alcuni modelli aggiungono testo prima/dopo: estraiamo l'oggetto JSON principale
+        data = self._extract_json_from_text(raw)
+        if not isinstance(data, dict):
+            # Se non troviamo un oggetto JSON valido, fallback su dummy
             logger.warning("Impossibile estrarre JSON valido da risposta LLM, uso dummy.")
-            return json.dumps(self._build_dummy_llm_output(question), ensure_ascii=False)
-
-        # Verifica che sia JSON valido; se fallisce, fallback su dummy
-        try:
-            json.loads(candidate)
-            return candidate
-        except json.JSONDecodeError:
-            logger.warning("JSON LLM non valido, uso dummy.")
-            return json.dumps(self._build_dummy_llm_output(question), ensure_ascii=False)
+            return self._build_dummy_llm_output(question)
+        return data
 
     def ask_llm_structured(self, question: str) -> LLMOutput:
         """
-        Come ask_llm_structured_raw ma ritorna un oggetto LLMOutput pydantic.
+        Come ask_llm_structured_raw ma ritorna un oggetto LLMOutput pydantic
+        (usa direttamente il dict già parsato, senza ri-serializzarlo).
         """
         try:
-            raw = self.ask_llm_structured_raw(question)
-            data = json.loads(raw)
-        except (LLMCallError, json.JSONDecodeError) as e:
+            data = self._ask_llm_structured_data(question)
+        except LLMCallError as e:
             logger.error("Failed to obtain structured output: %s", e)
             data = self._build_dummy_llm_output(question)
-            if isinstance(e, LLMCallError):
-                self._record_llm_status("Structured Extractor", e.reason)
+            self._record_llm_status("Structured Extractor", e.reason)
 
         logic_program_dict = data.get("logic_program")
         if not isinstance(logic_program_dict, dict):
@@ -654,8 +952,8 @@ Lo schema è il seguente:
             return self._build_dummy_logic_program(question)
         
         try:
-            # Prepare input data for prompt
-            canonicalization_dict = canonicalization.model_dump()
+            # Prepare input data for prompt (serialized once, directly by pydantic)
+            canonicalization_json = canonicalization.model_dump_json(indent=2)
             
             # Load prompt template
             template = self.prompt_loader.load_text_file("prompt_phase_2_2_structured_extractor.txt")
@@ -663,7 +961,7 @@ Lo schema è il seguente:
             # Build input JSON for injection
             input_data = {
                 "question": question,
-                "canonicalization": canonicalization_dict,
+                "canonicalization": canonicalization_json,
                 "target_task": "determine if ResponsabilitaContrattuale(Debitore, Creditore, Contratto) is entailed or not"
             }
             
@@ -773,8 +1071,8 @@ Lo schema è il seguente:
             }
         
         try:
-            # Prepare input data for prompt
-            logic_program_dict = logic_program_v1.model_dump()
+            # Prepare input data for prompt (serialized once, directly by pydantic)
+            logic_program_json = logic_program_v1.model_dump_json(indent=2)
             
             # Load prompt template
             template = self.prompt_loader.load_text_file("prompt_phase_2_3_refinement_llmoutput_v2.txt")
@@ -784,10 +1082,7 @@ Lo schema è il seguente:
                 "question_json": json.dumps(question, ensure_ascii=False),
                 "question": question,
                 "previous_answer": (answer_v1 or "").replace("{", "\\{").replace("}", "\\}"),
-                "logic_program_v1_json": json.dumps(
-                    logic_program_dict, ensure_ascii=False, indent=2
-                ),
-                "logic_program_v1": logic_program_dict,
+                "logic_program_v1_json": logic_program_json,
                 "status_v1": feedback_v1.status,
                 "missing_links_v1": json.dumps(
                     feedback_v1.missing_links, ensure_ascii=False
@@ -813,7 +1108,9 @@ Lo schema è il seguente:
                     "resources/nsla_v2/nsla_v_2_iterative_loop_design.md",
                     "resources/ontology/legal_it_v1.yaml"
                 ],
-                use_double_braces=False
+                use_double_braces=False,
+                # Context files first: the prefix stays identical across iterations
+                prepend_context=True
             )
             
             # Call LLM with retry
@@ -854,13 +1151,18 @@ Lo schema è il seguente:
         """
         Normalize LLM output before validating with LogicProgram.
         """
-        stats = defaultdict(int)
+        # Plain dict: only the counters that fire are recorded
+        stats: Dict[str, int] = {}
+        sanitize = self._sanitize_expression
+        format_atom = self._format_atom
 
         if isinstance(data, dict):
-            normalized = copy.deepcopy(data)
+            # Only top-level keys are reassigned below; nested lists/dicts are
+            # rebuilt rather than mutated, so a shallow copy is enough.
+            normalized = dict(data)
         else:
             normalized = {}
-            stats["logic_program_root_reset"] += 1
+            stats["logic_program_root_reset"] = 1
 
         normalized.setdefault("dsl_version", "2.1")
         normalized.setdefault("sorts", {})
@@ -870,26 +1172,34 @@ Lo schema è il seguente:
         normalized.setdefault("rules", [])
         normalized.setdefault("facts", {})
 
+        # Fast path: already canonical (e.g. a program echoed back from a
+        # previous iteration), nothing to coerce or rebuild.
+        if _is_canonical_logic_program(normalized):
+            return normalized, stats
+
         # Ensure container types (treat scalars/nulls as empty)
         if not isinstance(normalized.get("sorts"), dict):
             normalized["sorts"] = {}
-            stats["sorts_reset"] += 1
+            stats["sorts_reset"] = 1
 
         constants = normalized.get("constants")
         if isinstance(constants, list):
             const_map: Dict[str, Any] = {}
+            strings = 0
             for idx, const in enumerate(constants):
                 if isinstance(const, dict):
                     name = const.get("name") or f"c{idx}"
                     const_map[name] = {k: v for k, v in const.items() if k != "name"}
                 elif isinstance(const, str):
                     const_map[f"c{idx}"] = {"sort": const}
-                    stats["constant_strings_normalized"] += 1
+                    strings += 1
             normalized["constants"] = const_map
-            stats["constant_list_coerced"] += len(constants)
+            if strings:
+                stats["constant_strings_normalized"] = strings
+            stats["constant_list_coerced"] = len(constants)
         elif not isinstance(constants, dict):
             if constants not in (None, {}):
-                stats["constant_scalar_reset"] += 1
+                stats["constant_scalar_reset"] = 1
             normalized["constants"] = {}
 
         predicates = normalized.get("predicates")
@@ -901,10 +1211,10 @@ Lo schema è il seguente:
                     if name:
                         pred_map[name] = {k: v for k, v in pred.items() if k != "name"}
             normalized["predicates"] = pred_map
-            stats["predicate_list_coerced"] += 1
+            stats["predicate_list_coerced"] = 1
         elif not isinstance(predicates, dict):
             if predicates not in (None, {}):
-                stats["predicate_scalar_reset"] += 1
+                stats["predicate_scalar_reset"] = 1
             normalized["predicates"] = {}
 
         axioms = normalized.get("axioms")
@@ -914,24 +1224,26 @@ Lo schema è il seguente:
             normalized["axioms"] = [axioms]
         elif not isinstance(axioms, list):
             normalized["axioms"] = []
-            stats["axiom_entries_dropped"] += 1
+            stats["axiom_entries_dropped"] = 1
 
         if isinstance(normalized["axioms"], list):
             new_axioms = []
+            append = new_axioms.append
+            wrapped = dropped = 0
             for entry in normalized["axioms"]:
                 if isinstance(entry, str):
-                    formula = self._sanitize_expression(entry)
+                    formula = sanitize(entry)
                     if formula:
-                        new_axioms.append({"formula": formula})
-                        stats["axiom_strings_wrapped"] += 1
+                        append({"formula": formula})
+                        wrapped += 1
                     continue
                 if not isinstance(entry, dict):
-                    stats["axiom_entries_dropped"] += 1
+                    dropped += 1
                     continue
-                formula = self._sanitize_expression(entry.get("formula"))
+                formula = sanitize(entry.get("formula"))
                 if not formula:
-                    condition = self._sanitize_expression(entry.get("condition"))
-                    conclusion = self._sanitize_expression(entry.get("conclusion"))
+                    condition = sanitize(entry.get("condition"))
+                    conclusion = sanitize(entry.get("conclusion"))
                     if conclusion:
                         formula = (
                             conclusion
@@ -939,12 +1251,16 @@ Lo schema è il seguente:
                             else f"{condition} -> {conclusion}"
                         )
                 if not formula and entry.get("pred"):
-                    formula = self._format_atom(entry.get("pred"), entry.get("args"))
+                    formula = format_atom(entry.get("pred"), entry.get("args"))
                 if formula:
-                    new_axioms.append({"formula": formula})
+                    append({"formula": formula})
                 else:
-                    stats["axiom_entries_dropped"] += 1
+                    dropped += 1
             normalized["axioms"] = new_axioms
+            if wrapped:
+                stats["axiom_strings_wrapped"] = wrapped
+            if dropped:
+                stats["axiom_entries_dropped"] = stats.get("axiom_entries_dropped", 0) + dropped
 
         rules = normalized.get("rules")
         if rules is None:
@@ -953,30 +1269,32 @@ Lo schema è il seguente:
             normalized["rules"] = [rules]
         elif not isinstance(rules, list):
             normalized["rules"] = []
-            stats["rule_entries_dropped"] += 1
+            stats["rule_entries_dropped"] = 1
 
         if isinstance(normalized["rules"], list):
             new_rules = []
+            append = new_rules.append
+            wrapped = dropped = 0
             for entry in normalized["rules"]:
                 if isinstance(entry, str):
                     condition, conclusion = self._rule_parts_from_string(entry)
-                    new_rules.append(
+                    append(
                         {
-                            "condition": self._sanitize_expression(condition) or "true",
-                            "conclusion": self._sanitize_expression(conclusion),
+                            "condition": sanitize(condition) or "true",
+                            "conclusion": sanitize(conclusion),
                         }
                     )
-                    stats["rule_strings_wrapped"] += 1
+                    wrapped += 1
                     continue
                 if not isinstance(entry, dict):
-                    stats["rule_entries_dropped"] += 1
+                    dropped += 1
                     continue
-                condition = self._sanitize_expression(entry.get("condition")) or "true"
-                conclusion = self._sanitize_expression(entry.get("conclusion"))
+                condition = sanitize(entry.get("condition")) or "true"
+                conclusion = sanitize(entry.get("conclusion"))
                 if not conclusion and entry.get("pred"):
-                    conclusion = self._format_atom(entry.get("pred"), entry.get("args"))
+                    conclusion = format_atom(entry.get("pred"), entry.get("args"))
                 if conclusion:
-                    new_rules.append(
+                    append(
                         {
                             "condition": condition,
                             "conclusion": conclusion,
@@ -984,16 +1302,20 @@ Lo schema è il seguente:
                         }
                     )
                 else:
-                    stats["rule_entries_dropped"] += 1
+                    dropped += 1
             normalized["rules"] = new_rules
+            if wrapped:
+                stats["rule_strings_wrapped"] = wrapped
+            if dropped:
+                stats["rule_entries_dropped"] = stats.get("rule_entries_dropped", 0) + dropped
 
         facts = normalized.get("facts")
         if isinstance(facts, list):
             normalized["facts"] = {fact: True for fact in facts if isinstance(fact, str)}
-            stats["fact_list_coerced"] += len(facts)
+            stats["fact_list_coerced"] = len(facts)
         elif not isinstance(facts, dict):
             if facts not in (None, {}):
-                stats["fact_scalar_reset"] += 1
+                stats["fact_scalar_reset"] = 1
             normalized["facts"] = {}
 
         query = normalized.get("query")
@@ -1007,7 +1329,7 @@ Lo schema è il seguente:
             else:
                 normalized["query"] = None
 
-        return normalized, dict(stats)
+        return normalized, stats
 
     @staticmethod
     def _sanitize_expression(expr: Optional[str]) -> str:
@@ -1016,15 +1338,11 @@ Lo schema è il seguente:
         text = str(expr).strip()
         if not text:
             return ""
-        replacements = {
-            "∨": " or ",
-            "∧": " and ",
-            "¬": " not ",
-            "→": " -> ",
-            "⇒": " -> ",
-        }
-        for src, dst in replacements.items():
-            text = text.replace(src, dst)
+        # I connettivi sono tutti non-ASCII: il caso comune non richiede sostituzioni.
+        if not text.isascii():
+            for src, dst in _SANITIZE_REPLACEMENTS:
+                if src in text:
+                    text = text.replace(src, dst)
         return " ".join(text.split())
 
     @staticmethod
@@ -1066,7 +1384,7 @@ Lo schema è il seguente:
         text = str(error).lower()
         if isinstance(error, subprocess.TimeoutExpired) or "timeout" in text:
             return "timeout"
-        if "429" in text or "rate limit" in text or "didn't generate first token" in text:
+        if "rate limit" in text or _RE_THROTTLE.search(text):
             return "throttled"
         if "connection" in text:
             return "connection"
@@ -11,19 +11,20 @@ Reference document: `resources/nsla_v2/logic_dsl_v2.md`.
 """
 
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from types import MappingProxyType
+from typing import List, Mapping, Optional
 
 DSL_VERSION: str = "2.1"
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SortSpec:
     name: str
     description: str
     extends: Optional[str] = None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class PredicateSpec:
     name: str
     args: List[str]
@@ -31,7 +32,8 @@ class PredicateSpec:
     synonyms: List[str]
 
 
-SORTS: Dict[str, SortSpec] = {
+# Read-only views: the catalogues are shared by every module at import time.
+SORTS: Mapping[str, SortSpec] = MappingProxyType({
     "Entity": SortSpec("Entity", "Sort generica di fallback per input non canonico"),
     "Soggetto": SortSpec("Soggetto", "Parte generica di un rapporto giuridico"),
     "Debitore": SortSpec("Debitore", "Parte obbligata all'adempimento", extends="Soggetto"),
@@ -56,10 +58,10 @@ SORTS: Dict[str, SortSpec] = {
     "Pena": SortSpec("Pena", "Sanzione penale"),
     "Procedura": SortSpec("Procedura", "Sequenza di atti processuali/amministrativi"),
     "StrutturaSanitaria": SortSpec("StrutturaSanitaria", "Ente sanitario contrattualmente obbligato", extends="Soggetto"),
-}
+})
 
 
-PREDICATES: Dict[str, PredicateSpec] = {
+PREDICATES: Mapping[str, PredicateSpec] = MappingProxyType({
     "Contratto": PredicateSpec(
         "Contratto",
         ["Contratto"],
@@ -396,7 +398,12 @@ PREDICATES: Dict[str, PredicateSpec] = {
         "Sospensione temporanea dell'esecuzione forzata (art. 624 c.p.c.).",
         ["sospensione esecuzione"],
     ),
-}
+})
+
+# Arity per predicate, precomputed for the hot validation path.
+_PRED_ARITY: Mapping[str, int] = MappingProxyType(
+    {name: len(spec.args) for name, spec in PREDICATES.items()}
+)
 
 
 def get_sort_spec(name: str) -> SortSpec:
@@ -410,7 +417,7 @@ def get_predicate_spec(name: str) -> PredicateSpec:
 
 
 def is_known_predicate(name: str) -> bool:
-    return name in PREDICATES
+    return name in _PRED_ARITY
 
 
 def validate_predicate_signature(name: str, arity: int) -> None:
@@ -418,10 +425,9 @@ def validate_predicate_signature(name: str, arity: int) -> None:
     Ensure that `name` is known and that the arity matches the reference spec.
     Raises ValueError if the predicate is unknown or the arity mismatches.
     """
-    spec = PREDICATES.get(name)
-    if not spec:
+    expected = _PRED_ARITY.get(name)
+    if expected is None:
         raise ValueError(f"Unknown predicate: {name}")
-    expected = len(spec.args)
     if expected != arity:
         raise ValueError(f"Predicate '{name}' arity mismatch: expected {expected}, got {arity}")
 
@@ -161,6 +161,9 @@ class NSLAIterativeConfig(BaseModel):
     - max_iters: hard cap on the number of LLM↔Z3 iterations
     - eps: small threshold used to detect "no improvement"
     - stop_on_status: list of Z3 status values that should stop the loop early
+    - solver_params: Z3 solver parameters applied to every solver built by the
+      loop (e.g. {"relevancy": 0, "arith.propagate_eqs": False}); empty keeps
+      the Z3 defaults
     """
 
     max_iters: int = 3
@@ -169,6 +172,7 @@ class NSLAIterativeConfig(BaseModel):
         "consistent_entails",
         "inconsistent",
     ]
+    solver_params: Dict[str, Any] = {}
 
 
 class IterationHistory(BaseModel):
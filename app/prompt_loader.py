@@ -67,6 +67,11 @@ class PromptLoader:
             FileNotFoundError: If file doesn't exist
             IOError: If file cannot be read
         """
+        # Cache by the requested path too: skips the filesystem lookups below
+        request_key = f"text:{file_path}"
+        if request_key in self._cache:
+            return self._cache[request_key]
+        
         path = Path(file_path)
         if not path.is_absolute():
             # Try relative to prompts_dir first, then project_root
@@ -81,12 +86,13 @@ class PromptLoader:
         
         cache_key = f"text:{path}"
         if cache_key in self._cache:
+            self._cache[request_key] = self._cache[cache_key]
             return self._cache[cache_key]
         
         try:
             with open(path, 'r', encoding='utf-8') as f:
                 content = f.read()
-            self._cache[cache_key] = content
+            self._cache[cache_key] = self._cache[request_key] = content
             logger.debug(f"Loaded text file: {path}")
             return content
         except FileNotFoundError:
@@ -110,6 +116,11 @@ class PromptLoader:
             FileNotFoundError: If file doesn't exist
             yaml.YAMLError: If YAML is invalid
         """
+        # Cache by the requested path too: skips the filesystem lookups below
+        request_key = f"yaml:{file_path}"
+        if request_key in self._cache:
+            return self._cache[request_key]
+        
         path = Path(file_path)
         if not path.is_absolute():
             # Try relative to ontology_dir first, then project_root
@@ -124,12 +135,13 @@ class PromptLoader:
         
         cache_key = f"yaml:{path}"
         if cache_key in self._cache:
+            self._cache[request_key] = self._cache[cache_key]
             return self._cache[cache_key]
         
         try:
             with open(path, 'r', encoding='utf-8') as f:
                 content = yaml.safe_load(f) or {}
-            self._cache[cache_key] = content
+            self._cache[cache_key] = self._cache[request_key] = content
             logger.debug(f"Loaded YAML file: {path}")
             return content
         except FileNotFoundError:
@@ -156,6 +168,11 @@ class PromptLoader:
             FileNotFoundError: If file doesn't exist
             json.JSONDecodeError: If JSON is invalid
         """
+        # Cache by the requested path too: skips the filesystem lookups below
+        request_key = f"json:{file_path}"
+        if request_key in self._cache:
+            return self._cache[request_key]
+        
         path = Path(file_path)
         if not path.is_absolute():
             # Try relative to agents_dir, schemas_dir, then project_root
@@ -174,12 +191,13 @@ class PromptLoader:
         
         cache_key = f"json:{path}"
         if cache_key in self._cache:
+            self._cache[request_key] = self._cache[cache_key]
             return self._cache[cache_key]
         
         try:
             with open(path, 'r', encoding='utf-8') as f:
                 content = json.load(f)
-            self._cache[cache_key] = content
+            self._cache[cache_key] = self._cache[request_key] = content
             logger.debug(f"Loaded JSON file: {path}")
             return content
         except FileNotFoundError:
@@ -231,7 +249,8 @@ class PromptLoader:
         template: str,
         variables: Optional[Dict[str, Any]] = None,
         context_files: Optional[List[str]] = None,
-        use_double_braces: bool = False
+        use_double_braces: bool = False,
+        prepend_context: bool = False
     ) -> str:
         """
         Format a prompt template with variable substitution and context.
@@ -242,6 +261,9 @@ class PromptLoader:
             context_files: List of context file paths to include
             use_double_braces: If True, uses {{var}} syntax. If False, tries {var} first,
                              then falls back to safe regex substitution for remaining vars.
+            prepend_context: If True, place the context files before the prompt so that
+                             repeated calls share a byte-identical prefix (lets the backend
+                             reuse its prompt cache across refinement iterations).
             
         Returns:
             Formatted prompt string
@@ -267,34 +289,55 @@ class PromptLoader:
                     placeholder_pattern=r"\{(\w+)\}"
                 )
         
-        # Append context files if specified
+        # Append (or prepend) context files if specified
         if context_files:
-            context_section = "\n\n---\nCONTEXT FILES:\n"
-            for ctx_file in context_files:
-                try:
-                    if ctx_file.endswith('.yaml') or ctx_file.endswith('.yml'):
-                        ctx_content = self.load_yaml_file(ctx_file)
-                        context_section += f"\n### {ctx_file} ###\n"
-                        context_section += json.dumps(ctx_content, indent=2, ensure_ascii=False)
-                        context_section += "\n"
-                    elif ctx_file.endswith('.json'):
-                        ctx_content = self.load_json_file(ctx_file)
-                        context_section += f"\n### {ctx_file} ###\n"
-                        context_section += json.dumps(ctx_content, indent=2, ensure_ascii=False)
-                        context_section += "\n"
-                    else:
-                        ctx_content = self.load_text_file(ctx_file)
-                        context_section += f"\n### {ctx_file} ###\n"
-                        context_section += ctx_content
-                        context_section += "\n"
-                except Exception as e:
-                    logger.warning(f"Could not load context file {ctx_file}: {e}")
-                    continue
-            
-            formatted += context_section
+            context_section = self._build_context_section(context_files)
+            if prepend_context:
+                formatted = context_section.lstrip("\n") + "\n---\n\n" + formatted
+            else:
+                formatted += context_section
         
         return formatted
     
+    def _build_context_section(self, context_files: List[str]) -> str:
+        """
+        Render the CONTEXT FILES section for the given files.
+        
+        The rendered section is cached once every file loaded successfully, since
+        the same context files are attached to every call of a given phase.
+        """
+        cache_key = "context:" + "\x00".join(context_files)
+        if cache_key in self._cache:
+            return self._cache[cache_key]
+        
+        complete = True
+        context_section = "\n\n---\nCONTEXT FILES:\n"
+        for ctx_file in context_files:
+            try:
+                if ctx_file.endswith('.yaml') or ctx_file.endswith('.yml'):
+                    ctx_content = self.load_yaml_file(ctx_file)
+                    context_section += f"\n### {ctx_file} ###\n"
+                    context_section += json.dumps(ctx_content, indent=2, ensure_ascii=False)
+                    context_section += "\n"
+                elif ctx_file.endswith('.json'):
+                    ctx_content = self.load_json_file(ctx_file)
+                    context_section += f"\n### {ctx_file} ###\n"
+                    context_section += json.dumps(ctx_content, indent=2, ensure_ascii=False)
+                    context_section += "\n"
+                else:
+                    ctx_content = self.load_text_file(ctx_file)
+                    context_section += f"\n### {ctx_file} ###\n"
+                    context_section += ctx_content
+                    context_section += "\n"
+            except Exception as e:
+                logger.warning(f"Could not load context file {ctx_file}: {e}")
+                complete = False
+                continue
+        
+        if complete:
+            self._cache[cache_key] = context_section
+        return context_section
+    
     def inject_runtime_variables(
         self,
         template: str,
@@ -6,6 +6,11 @@ from app import benchmark
 from pathlib import Path
 
 
+def _json_body(payload):
+    """Encode a payload the way the backend serializes response bodies."""
+    return json.dumps(payload).encode("utf-8")
+
+
 def test_load_cases_non_empty():
     """Test that load_cases returns a non-empty list of cases."""
     # Create a minimal test case file
@@ -50,25 +55,25 @@ def test_run_benchmark_returns_stats():
         ]
         
         # Mock HTTP responses to return successful responses
-        with patch('app.benchmark.requests.post') as mock_post:
+        with patch('app.benchmark._SESSION.post') as mock_post:
             # Mock /llm_only response
             llm_mock = MagicMock()
             llm_mock.status_code = 200
-            llm_mock.json.return_value = {"answer": "Test LLM answer"}
+            llm_mock.content = _json_body({"answer": "Test LLM answer"})
             
             # Mock /legal_query response
             nsla_mock = MagicMock()
             nsla_mock.status_code = 200
-            nsla_mock.json.return_value = {
+            nsla_mock.content = _json_body({
                 "answer": "Test NSLA answer",
                 "verified": True,
                 "final_answer": "Test final answer"
-            }
+            })
 
             # Mock /legal_query_v2 response
             v2_mock = MagicMock()
             v2_mock.status_code = 200
-            v2_mock.json.return_value = {
+            v2_mock.content = _json_body({
                 "final_answer": "Test answer v2",
                 "feedback": {
                     "status": "consistent_entails",
@@ -79,12 +84,12 @@ def test_run_benchmark_returns_stats():
                 "explanation": {"summary": "All good"},
                 "phase2": {"feedback_v1": {"status": "consistent_no_entailment"}},
                 "fallback_used": False
-            }
+            })
 
             # Mock /legal_query_v2_iterative response
             iter_mock = MagicMock()
             iter_mock.status_code = 200
-            iter_mock.json.return_value = {
+            iter_mock.content = _json_body({
                 "mode": "v2_iterative",
                 "best": {
                     "iteration": 1,
@@ -100,7 +105,7 @@ def test_run_benchmark_returns_stats():
                     {"iteration": 0, "status": "consistent_no_entailment", "missing_links": ["X"], "conflicting_axioms": []},
                     {"iteration": 1, "status": "consistent_entails", "missing_links": [], "conflicting_axioms": []}
                 ]
-            }
+            })
             
             # Configure side effects for the four calls
             mock_post.side_effect = [llm_mock, nsla_mock, v2_mock, iter_mock]
@@ -152,10 +157,10 @@ def test_run_benchmark_handles_http_errors(monkeypatch):
         ]
         
         # Mock HTTP response to simulate server error
-        with patch('app.benchmark.requests.post') as mock_post:
+        with patch('app.benchmark._SESSION.post') as mock_post:
             error_mock = MagicMock()
             error_mock.status_code = 500
-            error_mock.json.return_value = {"detail": "Internal Server Error"}
+            error_mock.content = _json_body({"detail": "Internal Server Error"})
             
             # Configure to always return error
             mock_post.return_value = error_mock
@@ -187,8 +192,8 @@ def test_run_benchmark_handles_connection_errors(monkeypatch):
             }
         ]
         
-        # Mock requests.post to raise connection error
-        with patch('app.benchmark.requests.post') as mock_post:
+        # Mock the shared session to raise connection error
+        with patch('app.benchmark._SESSION.post') as mock_post:
             mock_post.side_effect = ConnectionError("Connection failed")
             
             result = benchmark.run_benchmark(
@@ -239,6 +244,11 @@ def test_is_correct_function():
     # Test no match
     assert benchmark.is_correct("The quick brown fox", "elephant") is False
 
+    # Trivial inputs short-circuit with the same results as substring matching
+    assert benchmark.is_correct("", "answer") is False
+    assert benchmark.is_correct("", "") is True
+    assert benchmark.is_correct("The ANSWER", "answer", gold_lower="answer") is True
+
 
 def test_run_benchmark_empty_cases(monkeypatch):
     """Test that run_benchmark handles empty cases list correctly."""
@@ -258,3 +268,244 @@ def test_run_benchmark_empty_cases(monkeypatch):
         assert "error" in result
         assert result["error"] is not None
         assert "Nessun caso di test trovato" in result["error"]
+
+
+def test_run_benchmark_parallel_endpoints(tmp_path):
+    """The four endpoint calls of a case can be dispatched concurrently."""
+    payloads = {
+        "/llm_only": {"answer": "Test answer"},
+        "/legal_query": {"final_answer": "Test answer", "verified": True},
+        "/legal_query_v2": {
+            "final_answer": "Test answer",
+            "guardrail": {"ok": True, "issues": []},
+        },
+        "/legal_query_v2_iterative": {
+            "best": {"final_answer": "Test answer", "guardrail": {"ok": True, "issues": []}},
+            "history": [{"iteration": 0}],
+        },
+    }
+
+    def fake_post(url, **kwargs):
+        path = url.split("http://fake", 1)[1].split("?", 1)[0]
+        response = MagicMock()
+        response.status_code = 200
+        response.content = _json_body(payloads[path])
+        return response
+
+    with patch.object(benchmark, 'load_cases') as mock_load:
+        mock_load.return_value = [
+            {"id": "test_001", "question": "Q?", "gold_answer": "Test answer", "tags": ["test"]}
+        ]
+        with patch('app.benchmark._SESSION.post', side_effect=fake_post) as mock_post:
+            result = benchmark.run_benchmark(
+                base_url="http://fake",
+                cases_path="fake_cases.json",
+                csv_path=str(tmp_path / "results.csv"),
+                parallel_endpoints=True,
+            )
+
+    assert mock_post.call_count == 4
+    assert result["n_success"] == 1
+    assert result["nsla_iter_accuracy"] == 1.0
+    assert result["iter_guardrail_pass_rate"] == 1.0
+
+
+def test_overlap_scores_reuse_gold_tokens():
+    """F1/BLEU give the same values with or without precomputed gold tokens."""
+    gold = "Il contratto è nullo per difetto di forma"
+    predicted = "il contratto è nullo"
+    gold_tokens = benchmark._tokenize(gold)
+
+    assert benchmark._f1_score(predicted, gold, gold_tokens) == benchmark._f1_score(predicted, gold)
+    assert benchmark._f1_score(gold, gold) == 1.0
+    assert benchmark._f1_score("", gold) == 0.0
+    assert benchmark._bleu_score_simple(gold, gold) == 1.0
+    assert 0.0 < benchmark._bleu_score_simple(predicted, gold) < 1.0
+    assert benchmark._bleu_score_simple("risposta diversa", gold) == 0.0
+
+
+def test_running_stat_matches_statistics():
+    """Online timing stats match the two-pass statistics module results."""
+    import statistics
+
+    samples = [1.5, 0.25, 3.75, 2.0, 0.5]
+    stat = benchmark._RunningStat()
+    for value in samples:
+        stat.push(value)
+
+    assert stat.count == len(samples)
+    assert stat.mean == pytest.approx(statistics.mean(samples))
+    assert stat.stdev() == pytest.approx(statistics.stdev(samples))
+    assert benchmark._RunningStat().stdev() == 0.0
+
+
+def test_run_benchmark_parallel_cases_keeps_case_order(tmp_path):
+    """Cases processed by a worker pool are still reported in input order."""
+    def fake_post(url, **kwargs):
+        question = kwargs["json"]["question"]
+        path = url.split("http://fake", 1)[1].split("?", 1)[0]
+        payloads = {
+            "/llm_only": {"answer": question},
+            "/legal_query": {"final_answer": question},
+            "/legal_query_v2": {"final_answer": question, "guardrail": {"ok": True}},
+            "/legal_query_v2_iterative": {"best": {"final_answer": question}},
+        }
+        response = MagicMock()
+        response.status_code = 200
+        response.content = _json_body(payloads[path])
+        return response
+
+    cases = [
+        {"id": f"case_{idx:03d}", "question": f"answer {idx}", "gold_answer": f"answer {idx}", "tags": ["t"]}
+        for idx in range(6)
+    ]
+    with patch.object(benchmark, 'load_cases', return_value=cases):
+        with patch('app.benchmark._SESSION.post', side_effect=fake_post):
+            result = benchmark.run_benchmark(
+                base_url="http://fake",
+                cases_path="fake_cases.json",
+                csv_path=str(tmp_path / "results.csv"),
+                max_workers=3,
+                jsonl_path=str(tmp_path / "results.jsonl"),
+            )
+
+    assert [row["id"] for row in result["details"]] == [case["id"] for case in cases]
+    assert result["n_success"] == 6
+    assert result["llm_only_accuracy"] == 1.0
+    assert result["v2_guardrail_pass_rate"] == 1.0
+    assert result["tag_stats"][0]["cases"] == 6
+
+    records = [json.loads(line) for line in (tmp_path / "results.jsonl").read_text().splitlines()]
+    assert [record["id"] for record in records] == [case["id"] for case in cases]
+    assert records[0]["tags"] == ["t"]
+    assert records[0]["v2_llm_status"] == {}
+
+
+def test_run_benchmark_closes_outputs_on_error(tmp_path):
+    """An error while processing cases still closes the CSV and JSONL outputs."""
+    opened = []
+    real_open = open
+
+    def tracking_open(*args, **kwargs):
+        handle = real_open(*args, **kwargs)
+        opened.append(handle)
+        return handle
+
+    cases = [{"id": "case_000", "question": "Q?", "gold_answer": "gold", "tags": []}]
+    with patch.object(benchmark, 'load_cases', return_value=cases), \
+            patch.object(benchmark, '_run_case', side_effect=RuntimeError("boom")), \
+            patch('builtins.open', side_effect=tracking_open):
+        with pytest.raises(RuntimeError):
+            benchmark.run_benchmark(
+                base_url="http://fake",
+                cases_path="fake_cases.json",
+                csv_path=str(tmp_path / "results.csv"),
+                jsonl_path=str(tmp_path / "results.jsonl"),
+            )
+
+    assert len(opened) == 2
+    assert all(handle.closed for handle in opened)
+
+
+def test_run_benchmark_ignores_empty_v2_judge(tmp_path):
+    """An empty `judge` object from /legal_query_v2 leaves the v2 vote blank."""
+    judges = {"case_000": {}, "case_001": {"confidence": 0.5}}
+
+    def fake_post(url, **kwargs):
+        question = kwargs["json"]["question"]
+        path = url.split("http://fake", 1)[1].split("?", 1)[0]
+        payloads = {
+            "/llm_only": {"answer": question},
+            "/legal_query": {"final_answer": question},
+            "/legal_query_v2": {"final_answer": question, "judge": judges[question]},
+            "/legal_query_v2_iterative": {"best": {"final_answer": question}},
+        }
+        response = MagicMock()
+        response.status_code = 200
+        response.content = _json_body(payloads[path])
+        return response
+
+    cases = [
+        {"id": case_id, "question": case_id, "gold_answer": case_id, "tags": []}
+        for case_id in judges
+    ]
+    with patch.object(benchmark, 'load_cases', return_value=cases):
+        with patch('app.benchmark._SESSION.post', side_effect=fake_post):
+            result = benchmark.run_benchmark(
+                base_url="http://fake",
+                cases_path="fake_cases.json",
+                csv_path=str(tmp_path / "results.csv"),
+            )
+
+    assert result["details"][0]["v2_judge_vote"] == ""
+    assert result["details"][1]["v2_judge_vote"] == "tie"
+    assert result["details"][1]["v2_judge_confidence"] == 0.5
+
+
+def test_fast_scores_match_reference_scores():
+    """Scoring against a precomputed gold cache matches the string-based helpers."""
+    gold = "La  risoluzione del contratto per inadempimento grave"
+    cache = benchmark._precompute_gold(gold)
+    answers = [
+        "",
+        "   ",
+        "la risoluzione del contratto",
+        "La risoluzione del contratto per inadempimento grave",
+        "inadempimento grave del contratto e risoluzione",
+    ]
+    for answer in answers:
+        assert benchmark._f1_score_fast(answer, cache) == benchmark._f1_score(answer, gold)
+        assert benchmark._bleu_score_simple_fast(answer, cache) == benchmark._bleu_score_simple(answer, gold)
+
+
+def test_run_benchmark_collects_background_judge_votes(tmp_path):
+    """Judge votes resolved in the background still land in rows and win rate."""
+    def fake_post(url, **kwargs):
+        path = url.split("http://fake", 1)[1].split("?", 1)[0]
+        payloads = {
+            "/llm_only": {"answer": "x"},
+            "/legal_query": {"final_answer": "x"},
+            "/legal_query_v2": {"final_answer": "gold"},
+            "/legal_query_v2_iterative": {"best": {"final_answer": "gold"}},
+            "/judge_compare": {"vote": "NSLA", "confidence": 0.9, "rationale": "ok"},
+        }
+        response = MagicMock()
+        response.status_code = 200
+        response.content = _json_body(payloads[path])
+        return response
+
+    cases = [
+        {"id": f"case_{idx}", "question": "Q?", "gold_answer": "gold", "tags": []}
+        for idx in range(3)
+    ]
+    with patch.object(benchmark, 'load_cases', return_value=cases):
+        with patch('app.benchmark._SESSION.post', side_effect=fake_post):
+            result = benchmark.run_benchmark(
+                base_url="http://fake",
+                cases_path="fake_cases.json",
+                csv_path=str(tmp_path / "results.csv"),
+                use_judge=True,
+            )
+
+    assert [row["judge_vote"] for row in result["details"]] == ["NSLA"] * 3
+    assert result["details"][0]["judge_confidence"] == 0.9
+    assert result["nsla_win_rate"] == 100.0
+    assert result["judge_votes"] == {"NSLA": 3}
+
+
+def test_session_pool_grows_with_concurrency(monkeypatch):
+    """The shared keep-alive pool is enlarged when a run needs more connections."""
+    monkeypatch.setattr(benchmark, "_SESSION", benchmark._build_session())
+    monkeypatch.setattr(benchmark, "_session_pool_maxsize", benchmark._DEFAULT_POOL_MAXSIZE)
+
+    benchmark._ensure_session_capacity(8)
+    assert benchmark._SESSION.get_adapter("http://fake")._pool_maxsize == benchmark._DEFAULT_POOL_MAXSIZE
+
+    previous = benchmark._SESSION.get_adapter("http://fake")
+    closed = []
+    monkeypatch.setattr(previous, "close", lambda: closed.append(previous))
+
+    benchmark._ensure_session_capacity(128)
+    assert benchmark._SESSION.get_adapter("http://fake")._pool_maxsize == 128
+    assert benchmark._session_pool_maxsize == 128
+    assert closed == [previous]
@@ -1,7 +1,7 @@
 import pytest
 
 from app.models import LogicProgram
-from app.guardrail_checker import run_guardrail
+from app.guardrail_checker import _clear_rule_checks, run_guardrail
 
 
 def build_valid_program() -> LogicProgram:
@@ -36,3 +36,39 @@ def test_guardrail_detects_invalid_predicate():
     assert not result.ok
     assert any(issue.code == "PREDICATE_ARITY_MISMATCH" for issue in result.issues)
 
+
+
+def test_guardrail_stops_at_dsl_version_mismatch():
+    program = build_valid_program()
+    program.dsl_version = "1.0"
+    program.predicates["Sconosciuto"] = {"arity": 1}  # type: ignore[index]
+
+    result = run_guardrail(program)
+
+    assert not result.ok
+    assert [issue.code for issue in result.issues] == ["DSL_VERSION_MISMATCH"]
+
+
+def test_guardrail_reuses_rule_checks_for_the_same_predicates(monkeypatch):
+    from app.translator import DSL21Parser
+
+    calls = []
+    original = DSL21Parser.parse_rules
+
+    def counting_parse_rules(self, rules):
+        calls.append(rules)
+        return original(self, rules)
+
+    monkeypatch.setattr(DSL21Parser, "parse_rules", counting_parse_rules)
+    _clear_rule_checks()
+
+    program = build_valid_program()
+    assert run_guardrail(program).ok
+    assert run_guardrail(program).ok
+    assert len(calls) == 1, "Second run should reuse the cached rule check"
+
+    # Different declared predicates: the rule is checked again and now fails
+    del program.predicates["Inadempimento"]  # type: ignore[attr-defined]
+    result = run_guardrail(program)
+    assert len(calls) == 2
+    assert [issue.code for issue in result.issues] == ["RULE_UNKNOWN_PREDICATE"]
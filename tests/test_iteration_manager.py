@@ -1,6 +1,6 @@
 from app.iteration_manager import IterationManager
 from app.models import LogicProgram
-from app.models_v2 import LLMOutputV2, NSLAIterativeConfig
+from app.models_v2 import IterationMetrics, IterationState, LLMOutputV2, NSLAIterativeConfig
 from app.logic_feedback import LogicFeedback
 from app.refinement_runtime import RefinementRuntime
 from app.history_summarizer import HistorySummarizer
@@ -124,3 +124,107 @@ def test_iteration_manager_respects_max_iters():
     assert len(history) == 2
     assert best.iteration in {0, 1}
 
+
+
+def test_iteration_manager_reuses_feedback_for_identical_programs():
+    # The stub always returns the same program: Z3 feedback is computed once
+    seq = _FeedbackSequence(
+        [
+            _logic_feedback("consistent_no_entailment", ["A"]),
+            _logic_feedback("consistent_no_entailment", ["B"]),
+        ]
+    )
+    manager = IterationManager(
+        refinement_runtime=_StubRefinementRuntime(),
+        config=NSLAIterativeConfig(max_iters=3),
+        history_summarizer=HistorySummarizer(),
+        solver_builder=_dummy_solver_builder,
+        feedback_builder=seq,
+    )
+
+    best, history = manager.run(
+        question="Domanda",
+        initial_program=LogicProgram(),
+        initial_feedback=_logic_feedback("consistent_no_entailment"),
+        initial_answer="Risposta v1",
+    )
+
+    assert seq.index == 1
+    assert len(history) == 2
+    assert history[1].feedback.missing_links == ["A"]
+
+
+def test_iteration_manager_keeps_postprocessed_program_on_cache_hit():
+    calls = []
+
+    def synthesize_axiom(program, feedback):
+        calls.append(program)
+        program.axioms.append({"formula": "Synth(x)"})
+        return feedback
+
+    manager = IterationManager(
+        refinement_runtime=_StubRefinementRuntime(),
+        config=NSLAIterativeConfig(max_iters=3),
+        history_summarizer=HistorySummarizer(),
+        solver_builder=_dummy_solver_builder,
+        feedback_builder=_FeedbackSequence(
+            [_logic_feedback("consistent_no_entailment", ["A"])]
+        ),
+        feedback_postprocessor=synthesize_axiom,
+    )
+
+    _, history = manager.run(
+        question="Domanda",
+        initial_program=LogicProgram(),
+        initial_feedback=_logic_feedback("consistent_no_entailment"),
+        initial_answer="Risposta v1",
+    )
+
+    assert len(calls) == 1
+    assert len(history) == 2
+    for state in history:
+        assert state.llm_output.logic_program["axioms"] == [{"formula": "Synth(x)"}]
+    assert history[0].llm_output.logic_program is not history[1].llm_output.logic_program
+
+
+def test_history_summarizer_entries_match_full_summary():
+    summarizer = HistorySummarizer()
+    history = []
+    for idx, status in enumerate(["consistent_no_entailment", "inconsistent", "consistent_no_entailment", "inconsistent"]):
+        history.append(
+            IterationState(
+                iteration=idx,
+                llm_output=LLMOutputV2(final_answer="a", logic_program={}, notes=""),
+                feedback=_logic_feedback(status, ["Nesso"] if idx % 2 else None),
+                metrics=IterationMetrics(iteration=idx),
+            )
+        )
+
+    entries = [summarizer.format_entry(state) for state in history]
+    for size in range(len(history) + 1):
+        assert summarizer.join_entries(entries[:size]) == summarizer.summarize(history[:size])
+
+
+def test_iteration_manager_applies_solver_params():
+    applied = {}
+
+    class _Solver:
+        def set(self, **params):
+            applied.update(params)
+
+    manager = IterationManager(
+        refinement_runtime=_StubRefinementRuntime(),
+        config=NSLAIterativeConfig(max_iters=1, solver_params={"relevancy": 0}),
+        history_summarizer=HistorySummarizer(),
+        solver_builder=lambda program, facts: (_Solver(), object()),
+        feedback_builder=_FeedbackSequence([_logic_feedback("consistent_entails")]),
+    )
+
+    manager.run(
+        question="Domanda",
+        initial_program=LogicProgram(),
+        initial_feedback=_logic_feedback("consistent_no_entailment"),
+        initial_answer="Risposta v1",
+    )
+
+    assert applied == {"relevancy": 0}
@@ -1,6 +1,7 @@
 from app.config import Settings
 from app.judge_runtime import JudgeRuntime
 from app.llm_client import LLMClient
+from app.models_v2 import JudgeLLMResult
 
 
 def test_judge_runtime_returns_tie_with_dummy_backend():
@@ -21,3 +22,71 @@ def test_judge_runtime_returns_tie_with_dummy_backend():
     assert result.confidence == 0.0
     assert result.rationale.startswith("Dummy backend") or "dummy" in result.rationale.lower()
 
+
+
+def test_judge_runtime_evaluate_batch_preserves_order():
+    settings = Settings(llm_backend="dummy")
+    client = LLMClient(settings)
+    runtime = JudgeRuntime(client, enabled=True)
+
+    items = [
+        {
+            "question": f"Domanda {idx}",
+            "reference_answer": None,
+            "answer_a": f"Risposta A {idx}",
+            "answer_b": f"Risposta B {idx}",
+        }
+        for idx in range(5)
+    ]
+
+    results = runtime.evaluate_batch(items, max_workers=3)
+
+    assert [result.question for result in results] == [item["question"] for item in items]
+    assert all(result.vote == "tie" for result in results)
+
+
+class _CountingJudgeClient:
+    def __init__(self, backend="ollama"):
+        self.backend = backend
+        self.calls = []
+
+    def call_judge_metric(self, **kwargs):
+        self.calls.append(kwargs)
+        return JudgeLLMResult(**kwargs, vote="NSLA", confidence=0.8, rationale="ok")
+
+
+_JUDGE_KWARGS = {
+    "question": "Cos'è la responsabilità contrattuale?",
+    "reference_answer": None,
+    "answer_a": "Risposta baseline",
+    "answer_b": "Risposta migliorata",
+    "label_a": "baseline_v1",
+    "label_b": "nsla_v2",
+}
+
+
+def test_judge_runtime_caches_identical_requests():
+    client = _CountingJudgeClient()
+    runtime = JudgeRuntime(client, enabled=True, enable_cache=True)
+
+    first = runtime.evaluate(**_JUDGE_KWARGS)
+    second = runtime.evaluate(**_JUDGE_KWARGS)
+    runtime.evaluate(**{**_JUDGE_KWARGS, "answer_b": "Altra risposta"})
+
+    assert second == first
+    assert second is not first
+    assert len(client.calls) == 2
+
+
+def test_judge_runtime_cache_is_opt_in_and_skips_dummy_backend():
+    client = _CountingJudgeClient()
+    runtime = JudgeRuntime(client, enabled=True)
+    runtime.evaluate(**_JUDGE_KWARGS)
+    runtime.evaluate(**_JUDGE_KWARGS)
+    assert len(client.calls) == 2
+
+    dummy = _CountingJudgeClient(backend="dummy")
+    runtime = JudgeRuntime(dummy, enabled=True, enable_cache=True)
+    runtime.evaluate(**_JUDGE_KWARGS)
+    runtime.evaluate(**_JUDGE_KWARGS)
+    assert len(dummy.calls) == 2
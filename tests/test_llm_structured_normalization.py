@@ -1,5 +1,7 @@
 import json
+import time
 
+import httpx
 import pytest
 
 from app.config import Settings
@@ -28,6 +30,30 @@ def test_normalize_logic_program_dict_coerces_strings():
     assert stats["constant_list_coerced"] == 1
 
 
+def test_normalize_logic_program_dict_leaves_input_untouched():
+    client = LLMClient(Settings(llm_backend="dummy"))
+    raw = {"axioms": ["A -> B"], "rules": [{"condition": "A", "conclusion": "B"}]}
+    snapshot = json.loads(json.dumps(raw))
+
+    client._normalize_logic_program_dict(raw)
+
+    assert raw == snapshot
+
+
+def test_normalize_logic_program_dict_is_idempotent():
+    client = LLMClient(Settings(llm_backend="dummy"))
+    raw = {
+        "axioms": ["A(x)  ∧ B(x) -> C(x)"],
+        "rules": [{"condition": "A(x)", "conclusion": "C(x)"}],
+    }
+
+    first, _ = client._normalize_logic_program_dict(raw)
+    second, stats = client._normalize_logic_program_dict(first)
+
+    assert second == first
+    assert stats == {}
+
+
 def test_rule_parts_from_string_handles_arrows():
     client = LLMClient(Settings(llm_backend="dummy"))
 
@@ -43,23 +69,20 @@ def test_rule_parts_from_string_handles_arrows():
 def test_ask_llm_structured_normalizes_logic_program(monkeypatch):
     client = LLMClient(Settings(llm_backend="dummy"))
 
-    def fake_raw(question: str) -> str:
-        return json.dumps(
-            {
-                "final_answer": "Test",
-                "premises": [],
-                "conclusion": "Test",
-                "logic_program": {
-                    "dsl_version": "2.1",
-                    "axioms": ["ContrattoValido(C) -> HaObbligo(C)"],
-                    "predicates": {},
-                    "rules": [],
-                },
+    def fake_data(question: str) -> dict:
+        return {
+            "final_answer": "Test",
+            "premises": [],
+            "conclusion": "Test",
+            "logic_program": {
+                "dsl_version": "2.1",
+                "axioms": ["ContrattoValido(C) -> HaObbligo(C)"],
+                "predicates": {},
+                "rules": [],
             },
-            ensure_ascii=False,
-        )
+        }
 
-    monkeypatch.setattr(client, "ask_llm_structured_raw", fake_raw)
+    monkeypatch.setattr(client, "_ask_llm_structured_data", fake_data)
 
     output = client.ask_llm_structured("Q")
     assert isinstance(output.logic_program.axioms[0], dict)
@@ -82,3 +105,121 @@ def test_call_llm_with_retry_records_status(monkeypatch):
     assert "Canonicalizer" in statuses
     assert "error" in statuses["Canonicalizer"]
 
+
+def test_extract_json_from_text_ignores_braces_in_strings():
+    client = LLMClient(Settings(llm_backend="dummy"))
+    payload = {"final_answer": "Vedi art. {1218} c.c.", "notes": "chiusa }"}
+    text = "Ecco la risposta:\n" + json.dumps(payload) + "\nFine { spuria"
+
+    assert client._extract_json_from_text(text) == payload
+
+
+def test_extract_json_from_text_is_linear_on_unmatched_braces():
+    client = LLMClient(Settings(llm_backend="dummy"))
+    text = "{" * 32000 + '{"ok": true}' + '{"' * 8000
+
+    started = time.perf_counter()
+    assert client._extract_json_from_text(text) == {"ok": True}
+    assert time.perf_counter() - started < 2.0
+
+
+def test_call_ollama_uses_http_api():
+    client = LLMClient(Settings(llm_backend="ollama"))
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(json.loads(request.content))
+        if len(requests) == 1:
+            return httpx.Response(200, json={"response": " {\"ok\": true} "})
+        return httpx.Response(429, json={"error": "rate limited"})
+
+    client._http = httpx.Client(base_url=client.ollama_url, transport=httpx.MockTransport(handler))
+
+    assert client._call_ollama("prompt", timeout=5) == '{"ok": true}'
+    assert requests[0] == {
+        "model": client.model_name,
+        "prompt": "prompt",
+        "stream": False,
+        "keep_alive": client.ollama_keep_alive,
+    }
+    with pytest.raises(LLMCallError) as exc:
+        client._call_ollama("prompt", timeout=5)
+    assert exc.value.reason == "throttled"
+
+
+def test_call_ollama_http_rejects_non_object_body():
+    client = LLMClient(Settings(llm_backend="ollama"))
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, json=["non", "dict"]))
+    client._http = httpx.Client(base_url=client.ollama_url, transport=transport)
+
+    with pytest.raises(LLMCallError) as exc:
+        client._call_ollama_http("prompt", timeout=5)
+    assert exc.value.reason == "error"
+
+
+def test_call_ollama_response_cache(monkeypatch, tmp_path):
+    monkeypatch.setenv("NSLA_LLM_RESPONSE_CACHE", "1")
+    monkeypatch.setenv("NSLA_LLM_RESPONSE_CACHE_DIR", str(tmp_path))
+    LLMClient.reload_env()
+    client = LLMClient(Settings(llm_backend="ollama"))
+    calls = []
+
+    def fake_http(prompt: str, timeout: int = 300) -> str:
+        calls.append(prompt)
+        return f"risposta {len(calls)}"
+
+    monkeypatch.setattr(client, "_call_ollama_http", fake_http)
+
+    assert client._call_ollama("prompt") == "risposta 1"
+    assert client._call_ollama("prompt") == "risposta 1"
+    assert client._call_ollama("altro prompt") == "risposta 2"
+    assert len(calls) == 2
+
+    # A fresh client reuses the responses persisted on disk
+    fresh = LLMClient(Settings(llm_backend="ollama"))
+    monkeypatch.setattr(fresh, "_call_ollama_http", fake_http)
+    assert fresh._call_ollama("prompt") == "risposta 1"
+    assert len(calls) == 2
+
+    monkeypatch.undo()
+    LLMClient.reload_env()
+    assert LLMClient(Settings(llm_backend="ollama")).response_cache_enabled is False
+
+
+def test_call_ollama_response_cache_ignores_empty_files(monkeypatch, tmp_path):
+    monkeypatch.setenv("NSLA_LLM_RESPONSE_CACHE", "1")
+    monkeypatch.setenv("NSLA_LLM_RESPONSE_CACHE_DIR", str(tmp_path))
+    LLMClient.reload_env()
+    client = LLMClient(Settings(llm_backend="ollama"))
+    cache_file = tmp_path / f"{client._response_cache_key('prompt')}.txt"
+    cache_file.write_text("", encoding="utf-8")
+    monkeypatch.setattr(client, "_call_ollama_http", lambda prompt, timeout=300: "risposta")
+
+    assert client._call_ollama("prompt") == "risposta"
+    assert cache_file.read_text(encoding="utf-8") == "risposta"
+    assert [path.name for path in tmp_path.iterdir()] == [cache_file.name]
+
+    monkeypatch.undo()
+    LLMClient.reload_env()
+
+
+def test_call_llm_with_retry_caps_backoff(monkeypatch):
+    client = LLMClient(Settings(llm_backend="ollama"))
+    client.max_retries = 4
+    client.retry_delay = 10.0
+    client.max_retry_delay = 15.0
+    client.retry_jitter = 0.5
+    sleeps = []
+
+    def fake_call(prompt: str, timeout: int = 300) -> str:
+        raise RuntimeError("connection refused")
+
+    monkeypatch.setattr(client, "_call_ollama", fake_call)
+    monkeypatch.setattr("app.llm_client.time.sleep", sleeps.append)
+
+    with pytest.raises(LLMCallError):
+        client._call_llm_with_retry("prompt", timeout=1, operation_name="Judge LLM")
+
+    assert len(sleeps) == 3
+    assert 5.0 <= sleeps[0] <= 15.0
+    assert all(7.5 <= delay <= 22.5 for delay in sleeps[1:])
@@ -32,6 +32,22 @@ def test_canonicalizer_runtime_cache_hits():
     assert out_1 == out_2
 
 
+def test_canonicalizer_runtime_cache_evicts_least_recently_used():
+    stub = _CanonicalizerStub()
+    runtime = CanonicalizerRuntime(stub, enable_cache=True, cache_size=2)
+
+    runtime.run("domanda a")
+    runtime.run("domanda b")
+    runtime.run("domanda a")  # hit: "domanda b" becomes the oldest entry
+    runtime.run("domanda c")
+    assert stub.calls == 3
+
+    runtime.run("domanda a")
+    assert stub.calls == 3, "Recently used entry should survive eviction"
+    runtime.run("domanda b")
+    assert stub.calls == 4, "Least recently used entry should have been evicted"
+
+
 def test_structured_extractor_enforces_version_and_fallback():
     class _ExtractorStub:
         def __init__(self, fail=False):
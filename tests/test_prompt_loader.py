@@ -64,6 +64,18 @@ class TestPromptLoader:
         assert "test" in result
         assert "version" in result or "predicates" in result
     
+    def test_format_prompt_with_prepended_context(self):
+        """Test that prepended context keeps a stable prefix across calls"""
+        loader = PromptLoader()
+        context = ["legal_it_v1.yaml"]
+        
+        first = loader.format_prompt("Iterazione {question}", {"question": "1"}, context, prepend_context=True)
+        second = loader.format_prompt("Iterazione {question}", {"question": "2"}, context, prepend_context=True)
+        
+        assert first.startswith("---\nCONTEXT FILES:")
+        assert first.endswith("Iterazione 1")
+        assert first[:-1] == second[:-1]
+    
     def test_load_prompt_with_context(self):
         """Test convenience method for loading prompt with context"""
         loader = PromptLoader()
@@ -88,6 +100,20 @@ class TestPromptLoader:
         
         assert content1 == content2
     
+    def test_cache_skips_path_resolution(self, monkeypatch):
+        """Test that cached files are served without touching the filesystem"""
+        loader = PromptLoader()
+        content = loader.load_text_file("prompt_phase_2_1_canonicalizer.txt")
+        ontology = loader.load_yaml_file("legal_it_v1.yaml")
+        
+        def fail_exists(self):
+            raise AssertionError("unexpected filesystem lookup")
+        
+        monkeypatch.setattr(Path, "exists", fail_exists)
+        
+        assert loader.load_text_file("prompt_phase_2_1_canonicalizer.txt") is content
+        assert loader.load_yaml_file("legal_it_v1.yaml") is ontology
+    
     def test_clear_cache(self):
         """Test cache clearing"""
         loader = PromptLoader()